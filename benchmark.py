@@ -0,0 +1,312 @@
+import argparse
+import datetime
+import json
+import os.path
+import random
+import shutil
+import struct
+import sys
+import tempfile
+import time
+import zlib
+
+from sys import argv
+
+try:
+	import resource
+except ImportError:
+	resource = None
+
+import build
+
+
+class Corpus:
+	DIRECTORIES_COPIED = [
+		build.Site.DIR_TEMPLATES,
+		build.Site.DIR_IMAGES,
+		build.Site.DIR_CSS,
+		build.Site.DIR_JAVASCRIPT
+	]
+
+	FILE_IMAGE = "figure.png"
+
+	WORDS = [
+		"noise", "terrain", "agent", "vector", "shader", "buffer", "gradient", "mesh", "grid", "pattern",
+		"system", "render", "sample", "layer", "plane", "texture", "function", "cell", "particle", "value"
+	]
+
+	def __init__(self, directory, options):
+		self.directory = directory
+		self.options = options
+		self.random = random.Random(options.seed)
+
+	@staticmethod
+	def make_png(width, height):
+		def chunk(type, data):
+			return struct.pack(">I", len(data)) + type + data + struct.pack(">I", zlib.crc32(type + data))
+
+		rows = b"".join(b"\x00" + b"\x80" * width * 3 for row in range(height))
+
+		return \
+			b"\x89PNG\r\n\x1a\n" +\
+			chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)) +\
+			chunk(b"IDAT", zlib.compress(rows)) +\
+			chunk(b"IEND", b"")
+
+	@staticmethod
+	def make_jpeg(width, height):
+		return \
+			b"\xff\xd8" +\
+			b"\xff\xc0" + struct.pack(">HBHHB", 11, 8, height, width, 1) + b"\x01\x11\x00" +\
+			b"\xff\xd9"
+
+	def write(self, file, content, mode="w"):
+		os.makedirs(os.path.dirname(file), exist_ok=True)
+
+		output = open(file, mode)
+		output.write(content)
+		output.close()
+
+	def make_sentence(self):
+		return " ".join(self.random.choice(self.WORDS) for word in range(self.random.randint(8, 24))).capitalize() + "."
+
+	def make_paragraph(self, index):
+		roll = self.random.random()
+
+		if roll < self.options.math:
+			return "<p>" + self.make_sentence() + " The value $x_" + str(index) + " = \\sqrt{a^2 + b^2}$ follows.</p>\n"
+
+		if roll < self.options.math + self.options.code:
+			return "<pre class=\"prettyprint lang-js\">\nfunction f" + str(index) + "(x) {\n\treturn x * " + str(index) + ";\n}\n</pre>\n"
+
+		return "<p>\n\t" + " ".join(self.make_sentence() for sentence in range(4)) + "\n</p>\n"
+
+	def make_content(self):
+		content = "<h2>Introduction</h2>\n"
+
+		for index in range(self.options.paragraphs):
+			content += self.make_paragraph(index)
+
+			if index < self.options.images:
+				content += "<figure>\n\t<img local src=\"img/" + self.FILE_IMAGE + "\">\n\t<figcaption>Figure " + str(index + 1) + "</figcaption>\n</figure>\n"
+
+		return content
+
+	def create_posts(self):
+		date = datetime.date(2000, 1, 1)
+		image = self.make_png(64, 48)
+
+		for index in range(self.options.posts):
+			date = date + datetime.timedelta(days=1)
+			directory = os.path.join(self.directory, build.Site.DIR_POSTS, str(date.year) + "_" + str(date.month) + "_" + str(date.day))
+
+			self.write(os.path.join(directory, build.Post.FILE_PROPERTIES), json.dumps({
+				build.Post.PROPERTY_TITLE: "Synthetic post " + str(index),
+				build.Post.PROPERTY_ABSTRACT: self.make_sentence(),
+				build.Post.PROPERTY_PREVIEW: "img/" + self.FILE_IMAGE
+			}))
+			self.write(os.path.join(directory, build.Post.FILE_CONTENT), self.make_content())
+			self.write(os.path.join(directory, "img", self.FILE_IMAGE), image, "wb")
+
+	def create_products(self, root, count, dated):
+		date = datetime.date(2000, 1, 1)
+		preview = self.make_jpeg(512, 512)
+
+		for index in range(count):
+			date = date + datetime.timedelta(days=1)
+
+			if dated:
+				name = str(date.year) + "_" + str(date.month) + "_" + str(date.day)
+			else:
+				name = str(index + 1) + "_product"
+
+			directory = os.path.join(self.directory, root, name)
+
+			self.write(os.path.join(directory, build.Product.FILE_PROPERTIES), json.dumps({
+				build.Sketch.KEY_TITLE: "Synthetic " + root + " " + str(index),
+				build.Sketch.KEY_DESCRIPTION: self.make_sentence(),
+				build.Sketch.KEY_URL: "https://example.com/" + str(index),
+				build.Sketch.KEY_SOURCE: "https://example.com/source/" + str(index)
+			}))
+			self.write(os.path.join(directory, build.Product.FILE_PREVIEW), preview, "wb")
+
+	def create(self):
+		root = os.path.dirname(os.path.abspath(build.__file__))
+
+		for directory in self.DIRECTORIES_COPIED:
+			shutil.copytree(os.path.join(root, directory), os.path.join(self.directory, directory))
+
+		self.create_posts()
+		self.create_products(build.Site.DIR_SKETCHES, self.options.sketches, True)
+		self.create_products(build.Site.DIR_GAMES, self.options.games, False)
+		self.create_products(build.Site.DIR_WORK, self.options.work, False)
+
+
+class Benchmark:
+	PHASES = [
+		"get_posts",
+		"build_posts",
+		"build_indices",
+		"build_sitemap",
+		"build_feeds"
+	]
+
+	def __init__(self, options):
+		self.options = options
+		self.results = {}
+
+	@staticmethod
+	def find_phases(records, name):
+		for record in records:
+			if record["name"] == name:
+				yield record
+
+			yield from Benchmark.find_phases(record["phases"], name)
+
+	@staticmethod
+	def get_peak_memory():
+		if resource is None:
+			return None
+
+		peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+		if sys.platform == "darwin":
+			return peak
+
+		return peak * 1024
+
+	def run_build(self, name):
+		options = build.parse_arguments(["--jobs", str(self.options.jobs)])
+
+		with open(os.devnull, "w") as devnull:
+			stdout = sys.stdout
+			sys.stdout = devnull
+
+			try:
+				start = time.perf_counter()
+				build.build(None, options)
+				elapsed = time.perf_counter() - start
+			finally:
+				sys.stdout = stdout
+
+		records = build.profiler.pop_records()
+
+		self.results[name] = elapsed
+
+		return records
+
+	def run(self):
+		records = self.run_build("build_full")
+
+		for phase in self.PHASES:
+			self.results[phase] = sum(record["time"] for record in self.find_phases(records, phase))
+
+		self.results["render"] = sum(record["time"] for record in self.find_phases(records, "render"))
+		self.results["minify"] = sum(record["time_minify"] for record in records)
+		self.results["posts_per_second"] = self.options.posts / self.results["build_posts"] if self.results["build_posts"] > 0 else 0
+
+		self.run_build("build_unchanged")
+
+		edited = os.path.join(build.Site.DIR_POSTS, sorted(os.listdir(build.Site.DIR_POSTS))[0], build.Post.FILE_CONTENT)
+
+		with open(edited, "a") as content:
+			content.write("<p>Edited.</p>\n")
+
+		self.run_build("build_one_post")
+
+		self.results["peak_rss"] = self.get_peak_memory()
+
+	def compare(self, baseline):
+		regressions = []
+
+		for name, value in sorted(self.results.items()):
+			if value is None or baseline.get(name) is None or baseline[name] == 0:
+				continue
+
+			if name == "posts_per_second":
+				ratio = baseline[name] / value if value > 0 else float("inf")
+			elif name == "peak_rss":
+				ratio = value / baseline[name]
+			elif value - baseline[name] < self.options.minimum:
+				continue
+			else:
+				ratio = value / baseline[name]
+
+			if ratio > 1 + self.options.tolerance:
+				regressions.append(name + " regressed by " + str(round((ratio - 1) * 100, 1)) + "% (" + str(baseline[name]) + " -> " + str(value) + ")")
+
+		return regressions
+
+	def report(self):
+		for name, value in sorted(self.results.items()):
+			if value is None:
+				print(name + ": unavailable")
+			elif name == "peak_rss":
+				print(name + ": " + str(round(value / (1 << 20), 1)) + " MiB")
+			elif name == "posts_per_second":
+				print(name + ": " + str(round(value, 1)))
+			else:
+				print(name + ": " + str(round(value * 1000, 1)) + " ms")
+
+
+def parse_arguments(arguments):
+	parser = argparse.ArgumentParser(description="Benchmark the site build on a synthetic corpus.")
+	parser.add_argument("--posts", type=int, default=1000, help="number of synthetic posts")
+	parser.add_argument("--paragraphs", type=int, default=40, help="number of paragraphs per post")
+	parser.add_argument("--math", type=float, default=0.1, help="fraction of paragraphs containing inline math")
+	parser.add_argument("--code", type=float, default=0.1, help="fraction of paragraphs that are code blocks")
+	parser.add_argument("--images", type=int, default=3, help="number of image references per post")
+	parser.add_argument("--sketches", type=int, default=20, help="number of synthetic sketches")
+	parser.add_argument("--games", type=int, default=5, help="number of synthetic games")
+	parser.add_argument("--work", type=int, default=10, help="number of synthetic work entries")
+	parser.add_argument("--seed", type=int, default=0, help="seed for the generated text")
+	parser.add_argument("-j", "--jobs", type=int, default=1, help="number of processes used to render posts")
+	parser.add_argument("--baseline", default="benchmark_baseline.json", help="baseline file to compare the results with")
+	parser.add_argument("--save-baseline", action="store_true", help="store the results as the new baseline")
+	parser.add_argument("--tolerance", type=float, default=0.2, help="relative slowdown allowed before a result counts as a regression")
+	parser.add_argument("--minimum", type=float, default=0.01, help="absolute slowdown in seconds below which a timing never counts as a regression")
+	parser.add_argument("--keep", action="store_true", help="keep the generated corpus instead of deleting it")
+
+	return parser.parse_args(arguments)
+
+def main():
+	options = parse_arguments(argv[1:])
+	baseline_file = os.path.abspath(options.baseline)
+	directory = tempfile.mkdtemp(prefix="site_benchmark_")
+	working_directory = os.getcwd()
+
+	print("Generating " + str(options.posts) + " posts in " + directory)
+
+	try:
+		Corpus(directory, options).create()
+		os.chdir(directory)
+
+		benchmark = Benchmark(options)
+		benchmark.run()
+	finally:
+		os.chdir(working_directory)
+
+		if not options.keep:
+			shutil.rmtree(directory)
+
+	benchmark.report()
+
+	if options.save_baseline:
+		baseline_output = open(baseline_file, "w")
+		json.dump(benchmark.results, baseline_output, indent="\t", sort_keys=True)
+		baseline_output.close()
+
+		print("Saved baseline to " + baseline_file)
+	elif os.path.isfile(baseline_file):
+		baseline_input = open(baseline_file)
+		regressions = benchmark.compare(json.load(baseline_input))
+		baseline_input.close()
+
+		for regression in regressions:
+			print("Regression: " + regression)
+
+		if regressions:
+			sys.exit(1)
+
+if __name__ == "__main__":
+	main()
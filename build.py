@@ -1,437 +1,2264 @@
+import argparse
+import concurrent.futures
+import contextlib
+import cProfile
 import json
 import math
 import sys
 import os.path
 import datetime
+import filecmp
+import hashlib
+import heapq
+import html.parser
+import http.server
+import mimetypes
 import re
+import shutil
+import struct
+import threading
+import time
+import traceback
+import zlib
 
 from sys import argv
 from os import listdir
 
+try:
+	from compression import zstd
+except ImportError:
+	zstd = None
+
+try:
+	import numpy
+except ImportError:
+	numpy = None
+
+worker_site = None
+
+def initialize_worker(site, log_scope):
+	global worker_site
+
+	worker_site = site
+	worker_site.set_log_scope(log_scope)
+	profiler.reset()
+
+def build_post(index):
+	worker_site.build_post(index)
+
+	return worker_site.manifest.pop_touched(), profiler.pop_records()
+
 def format_page_name(name):
 	return name.replace(" ", "_").lower() + ".html"
 
-def compress(string):
-	return string.replace("\t", "").replace(">\n", ">").replace("    ", "")
+class Minifier:
+	REGEX_TAG = re.compile("<(/?)([A-Za-z][^\\s/>]*)((?:\"[^\"]*\"|'[^']*'|[^'\">])*)>|<![A-Za-z][^>]*>")
+	REGEX_ATTRIBUTE = re.compile("\\s*([^\\s\"'>/=]+)(?:\\s*=\\s*(\"[^\"]*\"|'[^']*'|[^\\s\"'=<>`]+))?")
+	REGEX_UNQUOTED = re.compile("[^\\s\"'=<>`]+")
+	REGEX_WHITESPACE = re.compile("\\s+")
+
+	REGEX_CSS_COMMENT = re.compile("(\"(?:\\\\.|[^\"\\\\])*\"|'(?:\\\\.|[^'\\\\])*')|/\\*.*?\\*/", re.DOTALL)
+	REGEX_CSS_STRING = re.compile("\"(?:\\\\.|[^\"\\\\])*\"|'(?:\\\\.|[^'\\\\])*'")
+	REGEX_CSS_PUNCTUATION = re.compile(" ?([{};,>]) ?")
+
+	RAW_ELEMENTS = ["pre", "textarea", "script", "style"]
+	BLOCK_ELEMENTS = [
+		"!doctype", "html", "head", "body", "title", "meta", "link", "base",
+		"address", "article", "aside", "blockquote", "details", "dialog", "dd", "div", "dl", "dt",
+		"fieldset", "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6",
+		"header", "hr", "li", "main", "nav", "ol", "p", "pre", "section", "summary", "ul",
+		"table", "caption", "colgroup", "col", "thead", "tbody", "tfoot", "tr", "td", "th"
+	]
+	EDGE_ELEMENTS = ["head", "body"]
+	REFERENCE_ATTRIBUTES = ["src", "href"]
 
-def replace_keys(keys, string):
-	regex = re.compile("|".join(map(re.escape, keys.keys())))
+	def __init__(self, rewrite=None):
+		self.rewrite = rewrite
+		self.pending = ""
+		self.text = ""
+		self.raw = None
+		self.previous = None
+		self.head = False
+		self.bytes_in = 0
+		self.bytes_out = 0
 
-	return regex.sub(lambda match: keys[match.group(0)], string)
+	def feed(self, fragment):
+		self.bytes_in = self.bytes_in + len(fragment.encode("utf-8"))
+		self.pending = self.pending + fragment
 
-def inline_icons(string):
-	regex = re.compile("\$icon-(.+)\$")
+		return self.process(False)
 
-	def replace_icon(match):
-		name = "img/ico_" + match.group(1) + ".svg"
+	def close(self):
+		return self.process(True)
 
-		with open(name, 'r') as icon_file:
-			return icon_file.read()
+	def get_saved(self):
+		return self.bytes_in - self.bytes_out
 
-	return regex.sub(replace_icon, string)
+	@staticmethod
+	def minify_css_code(code):
+		code = Minifier.REGEX_WHITESPACE.sub(" ", code)
+		code = Minifier.REGEX_CSS_PUNCTUATION.sub("\\1", code)
 
+		return code.replace(": ", ":").replace(";}", "}")
 
-class Post:
-	FILE_CONTENT = "content.html"
-	FILE_PROPERTIES = "properties.json"
-	FILE_KATEX_CSS = "katex_css.html"
-	FILE_KATEX_SCRIPT = "katex_script.html"
-	FILE_PRETTIFY = "prettify.html"
+	@staticmethod
+	def minify_css(css):
+		css = Minifier.REGEX_CSS_COMMENT.sub(lambda match: match.group(1) or " ", css)
+		result = []
+		position = 0
 
-	PROPERTY_TITLE = "title"
-	PROPERTY_ABSTRACT = "abstract"
-	PROPERTY_PREVIEW = "preview"
+		for match in Minifier.REGEX_CSS_STRING.finditer(css):
+			result.append(Minifier.minify_css_code(css[position:match.start()]))
+			result.append(match.group(0))
+			position = match.end()
 
-	DIR_JAVASCRIPT = "js"
-	DIR_CSS = "css"
+		result.append(Minifier.minify_css_code(css[position:]))
 
-	CLASS_POST_LINK = "post-link"
-	CLASS_POST_REFERENCE = "post-reference"
-	CLASS_POST_REFERENCE_LEFT = "post-reference-left"
-	CLASS_POST_REFERENCE_RIGHT = "post-reference-right"
+		return "".join(result).strip()
 
-	ID_REFERENCES = "references"
+	def is_edge(self, name):
+		return name is None or name in self.EDGE_ELEMENTS
 
-	DAY_ABBREVIATIONS = [
-		"Mon",
-		"Tue",
-		"Wed",
-		"Thu",
-		"Fri",
-		"Sat",
-		"Sun"
-	]
+	def minify_text(self, text, next):
+		if not text:
+			return text
 
-	MONTH_ABBREVIATIONS = [
-		"Jan",
-		"Feb",
-		"Mar",
-		"Apr",
-		"May",
-		"Jun",
-		"Jul",
-		"Aug",
-		"Sep",
-		"Oct",
-		"Nov",
-		"Dec"
-	]
+		text = self.REGEX_WHITESPACE.sub(" ", text)
 
-	def __init__(self, site, directory):
-		self.site = site
-		self.directory = directory
-		self.content = Site.DIR_POSTS + "/" + directory + "/" + self.FILE_CONTENT
-		self.properties = Site.DIR_POSTS + "/" + directory + "/" + self.FILE_PROPERTIES
+		if text == " ":
+			if self.head or self.is_edge(self.previous) or self.is_edge(next):
+				return ""
 
-		self.validate_requirements()
-		self.read_properties()
+			if self.previous in self.BLOCK_ELEMENTS and next in self.BLOCK_ELEMENTS:
+				return ""
 
-	@staticmethod
-	def get_katex_css():
-		file = open(Site.DIR_TEMPLATES + "/" + Post.FILE_KATEX_CSS)
-		content = file.read()
-		file.close()
+			return text
 
-		return content
+		if text[0] == " " and self.is_edge(self.previous):
+			text = text[1:]
 
-	@staticmethod
-	def get_katex_script():
-		file = open(Site.DIR_TEMPLATES + "/" + Post.FILE_KATEX_SCRIPT)
-		content = file.read()
-		file.close()
+		if text[-1] == " " and self.is_edge(next):
+			text = text[:-1]
 
-		return content
+		return text
 
 	@staticmethod
-	def get_prettify():
-		file = open(Site.DIR_TEMPLATES + "/" + Post.FILE_PRETTIFY)
-		content = file.read()
-		file.close()
+	def get_tag_name(match):
+		if match.group(2) is None:
+			return "!doctype"
 
-		return content
+		return match.group(2).lower()
 
-	def get_content(self, previous, next):
-		contentFile = open(self.content)
-		content = self.get_post_header(self.properties[self.PROPERTY_TITLE]) + contentFile.read() + self.build_neighbors(previous, next)
-		contentFile.close()
+	def minify_attributes(self, attributes):
+		attributes = attributes.strip()
+		closed = attributes.endswith("/")
 
-		return content.replace("local src=\"", "src=\"" + self.site.DIR_POSTS + "/" + self.directory + "/").replace("local href=\"", "href=\"" + self.site.DIR_POSTS + "/" + self.directory + "/")
+		if closed:
+			attributes = attributes[:-1].rstrip()
 
-	def build(self, previous, next):
-		self.site.log("Building " + self.get_post_file_name())
-		self.site.log_scope_increment()
+		result = []
+		position = 0
 
-		content = self.get_content(previous, next)
+		while position < len(attributes):
+			match = self.REGEX_ATTRIBUTE.match(attributes, position)
 
-		if "$" in content:
-			post_script = self.get_katex_script()
-			additional_css = self.get_css() + self.get_katex_css()
-		else:
-			post_script = ""
-			additional_css = self.get_css()
+			if match is None or match.end() == position:
+				return None
 
-		if "<pre class=\"prettyprint" in content or "<code class=\"prettyprint" in content:
-			post_script += self.get_prettify()
+			name, value = match.group(1), match.group(2)
 
-		result = replace_keys({
-			self.site.KEY_TITLE: self.site.TITLE + self.site.TITLE_DIVISOR + self.properties[self.PROPERTY_TITLE],
-			self.site.KEY_DESCRIPTION: self.properties[self.PROPERTY_ABSTRACT],
-			self.site.KEY_ADDITIONAL_CSS: additional_css,
-			self.site.KEY_MENU_BUTTONS: self.site.build_menu(),
-			self.site.KEY_CONTENT: content,
-			self.site.KEY_POST_SCRIPT: post_script,
-			self.site.KEY_YEAR: str(datetime.datetime.now().year),
-			self.site.KEY_META: self.get_meta()
-			}, self.site.template)
-
-		file = open(self.get_post_file_name(), "w")
-		file.write(compress(result))
-		file.close()
+			if value is None:
+				result.append(name)
+			else:
+				if value[0] == "\"" or value[0] == "'":
+					unquoted = value[1:-1]
+				else:
+					unquoted = value
 
-		self.site.log_scope_decrement()
+				if self.rewrite is not None and name.lower() in self.REFERENCE_ATTRIBUTES:
+					rewritten = self.rewrite(unquoted)
 
-		return self.build_post_link()
+					if rewritten != unquoted:
+						unquoted = rewritten
+						value = "\"" + rewritten + "\""
 
-	def make_meta(self, property, content):
-		return "<meta property=\"" + property + "\" content=\"" + content + "\"/>"
+				result.append((name, value, unquoted))
 
-	def get_meta(self):
-		return \
-			self.make_meta("og:title", self.properties[self.PROPERTY_TITLE]) +\
-			self.make_meta("og:url", self.site.URL + self.get_post_file_name()) +\
-			self.make_meta("og:description", self.properties[self.PROPERTY_ABSTRACT]) +\
-			self.make_meta("og:image", self.site.URL + self.site.DIR_POSTS + "/" + self.directory + "/" + self.properties[self.PROPERTY_PREVIEW]) +\
-			self.make_meta("twitter:image", self.site.URL + self.site.DIR_POSTS + "/" + self.directory + "/" + self.properties[self.PROPERTY_PREVIEW]) +\
-			self.make_meta("twitter:description", self.properties[self.PROPERTY_ABSTRACT]) + self.make_meta("twitter:site", "jobtalle.com") +\
-			self.make_meta("twitter:card", "summary") + self.make_meta("twitter:title", self.properties[self.PROPERTY_TITLE])
+			position = match.end()
 
-	def get_css(self):
-		result = ""
+			if position < len(attributes) and not attributes[position].isspace() and attributes[position - 1] not in "\"'":
+				return None
 
-		dir = Site.DIR_POSTS + "/" + self.directory + "/" + self.DIR_CSS
+		parts = []
 
-		if os.path.isdir(dir):
-			for file in listdir(dir):
-				if file.endswith(".css"):
-					result = result + "<link rel=\"stylesheet\" type=\"text/css\" href=\"" + dir + "/" + file + "\">"
+		for index, attribute in enumerate(result):
+			if isinstance(attribute, str):
+				parts.append(attribute)
 
-		return result
+				continue
 
-	def validate_requirements(self):
-		if not os.path.isfile(self.content):
-			self.site.log("Post " + self.directory + " has no " + self.FILE_CONTENT)
-			self.site.abort()
+			name, value, unquoted = attribute
 
-		if not os.path.isfile(self.properties):
-			self.site.log("Post " + self.directory + " has no " + self.FILE_PROPERTIES)
-			self.site.abort()
+			if closed and index == len(result) - 1 or\
+				not self.REGEX_UNQUOTED.fullmatch(unquoted) or\
+				unquoted.endswith("/"):
+				parts.append(name + "=" + value)
+			else:
+				parts.append(name + "=" + unquoted)
 
-	def read_properties(self):
-		properties_file = open(self.properties)
-		self.properties = json.load(properties_file)
-		properties_file.close()
+		return "".join(" " + part for part in parts) + ("/" if closed else "")
 
-	def get_date(self):
-		parts = self.directory.split("_")
-		year = parts[0]
-		month = self.MONTH_ABBREVIATIONS[int(parts[1]) - 1]
-		day = parts[2]
+	def minify_tag(self, match):
+		if match.group(2) is None:
+			return match.group(0)
 
-		return str(day) + " " + month + " " + str(year)
+		if match.group(1):
+			return "</" + match.group(2) + ">"
 
-	def get_lastmod(self):
-		parts = self.directory.split("_")
-		year = parts[0]
-		month = parts[1]
-		day = parts[2]
+		attributes = self.minify_attributes(match.group(3))
 
-		return str(year) + "-" + str(month.zfill(2)) + "-" + str(day.zfill(2))
+		if attributes is None:
+			return match.group(0)
 
-	def get_lastmod_rss(self):
-		parts = self.directory.split("_")
-		year = parts[0]
-		month = parts[1]
-		day = parts[2]
+		return "<" + match.group(2) + attributes + ">"
 
-		return self.DAY_ABBREVIATIONS[datetime.datetime(int(year), int(month), int(day)).weekday()] + ", " + str(day).rjust(2, '0') + " " + self.MONTH_ABBREVIATIONS[int(month) - 1] + " " + str(year) + " 08:00:00 GMT"
+	def process(self, final):
+		text = self.pending
+		length = len(text)
+		output = []
+		start = 0
+		search = 0
 
-	def get_post_header(self, title, url=None):
-		if url is None:
-			link_open = ""
-			link_close = ""
-		else:
-			link_open = "<a href=\"" + url + "\">"
-			link_close = "</a>"
+		while True:
+			if self.raw is not None:
+				match = self.raw.search(text, start)
 
-		return \
-			"<h1>" +\
-			link_open +\
-			title +\
-			link_close +\
-			"</h1><span class=\"date\">" +\
-			self.get_date() +\
-			"</span>"
+				if match is None:
+					if final:
+						output.append(text[start:])
+						start = length
 
-	def get_title(self):
-		return self.properties[self.PROPERTY_TITLE]
+					break
 
-	def get_description(self):
-		return self.properties[self.PROPERTY_ABSTRACT]
+				output.append(text[start:match.start()])
+				start = search = match.start()
+				self.raw = None
 
-	def get_preview(self):
-		return \
-			"<div class=\"post-link-preview\"><a href=\"" +\
-			self.get_post_file_name() +\
-			"\"><img src=\"" +\
-			self.get_preview_file() +\
-			"\" title=\"" +\
-			self.properties[self.PROPERTY_TITLE] +\
-			"\"></a></div>"
+			index = text.find("<", search)
 
-	def get_abstract(self):
-		return "<p>" + self.properties[self.PROPERTY_ABSTRACT] + "</p>"
+			if index == -1:
+				if final:
+					output.append(self.minify_text(self.text + text[start:], None))
+					self.text = ""
+					start = length
 
-	def get_post_file_name(self):
-		return format_page_name(self.properties[self.PROPERTY_TITLE])
+				break
 
-	def get_preview_file(self):
-		return self.site.DIR_POSTS + "/" + self.directory + "/" + self.properties[self.PROPERTY_PREVIEW]
+			if text.startswith("<!--", index):
+				end = text.find("-->", index + 4)
 
-	def build_neighbor(self, neighbor, type):
-		if neighbor is None:
-			return ""
+				if end == -1:
+					if final:
+						output.append(self.minify_text(self.text + text[start:index], None))
+						output.append(text[index:])
+						self.text = ""
+						start = length
 
-		if type == self.CLASS_POST_REFERENCE_LEFT:
-			title_prefix = "Previously: "
-		else:
-			title_prefix = "Up next: "
+					break
 
-		return \
-			"<a href=\"" +\
-			neighbor.get_post_file_name() +\
-			"\" title=\"" +\
-			title_prefix +\
-			neighbor.properties[self.PROPERTY_TITLE] +\
-			"\"><div class=\"" +\
-			self.CLASS_POST_REFERENCE +\
-			" " +\
-			type +\
-			"\">" +\
-			neighbor.properties[self.PROPERTY_TITLE] +\
-			"</div></a>"
+				if text.startswith("<!--[", index):
+					output.append(self.minify_text(self.text + text[start:index], ""))
+					output.append(text[index:end + 3])
+					self.text = ""
+					self.previous = ""
+				else:
+					self.text = self.text + text[start:index]
 
-	def build_neighbors(self, previous, next):
-		return \
-			"<div id=\"" +\
-			self.ID_REFERENCES +\
-			"\">" +\
-			self.build_neighbor(previous, self.CLASS_POST_REFERENCE_LEFT) +\
-			self.build_neighbor(next, self.CLASS_POST_REFERENCE_RIGHT) +\
-			"</div>"
+				start = search = end + 3
 
-	def build_post_link(self):
-		return \
-			"<div class=\"" +\
-			self.CLASS_POST_LINK +\
-			"\"><div class=\"text\">" +\
-			self.get_post_header(self.properties[self.PROPERTY_TITLE], self.get_post_file_name()) +\
-			self.get_abstract() +\
-			"</div>" +\
-			self.get_preview() +\
-			"</div>"
+				continue
 
+			match = self.REGEX_TAG.match(text, index)
 
-class Product:
-	FILE_PROPERTIES = "properties.json"
-	FILE_PREVIEW = "preview.jpg"
+			if match is None:
+				if not final and (index + 1 == length or text[index + 1] in "/!" or text[index + 1].isalpha()):
+					break
 
-	CLASS = "product"
-	CLASS_SUMMARY = "summary"
+				search = index + 1
 
-	KEY_TITLE = "title"
-	KEY_URL = "url"
-	KEY_DESCRIPTION = "description"
+				continue
 
-	def __init__(self, site, directory):
-		self.site = site
-		self.directory = directory
-		self.properties = directory + "/" + self.FILE_PROPERTIES
+			name = self.get_tag_name(match)
 
-		self.read_properties()
+			output.append(self.minify_text(self.text + text[start:index], name))
+			output.append(self.minify_tag(match))
+			self.text = ""
+			self.previous = name
 
-	def read_properties(self):
-		properties_file = open(self.properties)
-		self.properties = json.load(properties_file)
-		properties_file.close()
+			if name == "head":
+				self.head = not match.group(1)
 
-	def build_title(self):
-		return "<h2>" + self.properties[self.KEY_TITLE] + "</h2>"
+			if match.group(2) is not None and not match.group(1) and name in self.RAW_ELEMENTS:
+				self.raw = re.compile("</" + match.group(2) + "[\\s/>]", re.IGNORECASE)
 
-	def build_image(self):
-		image = "<img src=\"" + self.directory + "/" + self.FILE_PREVIEW + "\">"
+			start = search = match.end()
 
-		if self.KEY_URL in self.properties:
-			return "<a href=\"" + self.properties[self.KEY_URL] + "\" target=\"_blank\">" + image + "</a>"
+		self.pending = text[start:]
 
-		return image
+		result = "".join(output)
+		self.bytes_out = self.bytes_out + len(result.encode("utf-8"))
 
-	def build_description(self):
-		return "<p>" + self.properties[self.KEY_DESCRIPTION] + "</p>"
+		return result
 
-	def build_content(self):
-		return "<div class=\"" + self.CLASS_SUMMARY + "\">" + self.build_image() + self.build_title() + self.build_description() + "</div>"
+class Profiler:
+	COUNTERS = [
+		"bytes_read",
+		"bytes_written",
+		"size_raw",
+		"size_minified",
+		"size_compressed",
+		"time_minify",
+		"files_unchanged",
+		"size_critical_css",
+		"size_icons_saved"
+	]
 
-	def build(self):
-		self.site.log("Building product \"" + self.properties[self.KEY_TITLE] + "\"")
+	def __init__(self):
+		self.local = threading.local()
 
-		return "<div class=\"" + self.CLASS + "\">" + self.build_content() + "</div>"
+	def reset(self):
+		self.local.stack = []
+		self.local.records = []
 
+	def get_stack(self):
+		if not hasattr(self.local, "stack"):
+			self.local.stack = []
+			self.local.records = []
 
-class Sketch:
-	FILE_PROPERTIES = "properties.json"
-	FILE_PREVIEW = "preview.jpg"
+		return self.local.stack
 
-	CLASS = "sketch"
-	CLASS_LINK = "round-button"
-	CLASS_PREVIEW = "preview"
-	CLASS_LINKS = "links"
-	CLASS_SUMMARY = "summary"
+	@contextlib.contextmanager
+	def phase(self, name):
+		stack = self.get_stack()
+		record = {
+			"name": name,
+			"time": 0.0,
+			"phases": []
+		}
 
-	KEY_TITLE = "title"
-	KEY_URL = "url"
-	KEY_SOURCE = "source"
-	KEY_DESCRIPTION = "description"
+		for counter in self.COUNTERS:
+			record[counter] = 0
 
-	TEXT_VIEW = "View"
-	TEXT_SOURCE = "Source"
+		start = time.perf_counter()
+		stack.append(record)
 
-	def __init__(self, site, directory):
-		self.site = site
-		self.directory = directory
-		self.properties = Site.DIR_SKETCHES + "/" + directory + "/" + self.FILE_PROPERTIES
+		try:
+			yield record
+		finally:
+			record["time"] = time.perf_counter() - start
+			stack.pop()
 
-		self.read_properties()
+			if stack:
+				stack[-1]["phases"].append(record)
+			else:
+				self.local.records.append(record)
 
-	def read_properties(self):
-		properties_file = open(self.properties)
-		self.properties = json.load(properties_file)
-		properties_file.close()
+	def count(self, counter, amount):
+		for record in self.get_stack():
+			record[counter] = record[counter] + amount
 
-	def build_image(self):
-		return "<a href=\"" + self.properties[self.KEY_URL] + "\" target=\"_blank\"><img src=\"" + Site.DIR_SKETCHES + "/" + self.directory + "/" + self.FILE_PREVIEW + "\"></a>"
+	def attach(self, records):
+		stack = self.get_stack()
 
-	def build_title(self):
-		return "<h2>" + self.properties[self.KEY_TITLE] + "</h2>"
+		for record in records:
+			for counter in self.COUNTERS:
+				self.count(counter, record[counter])
 
-	def build_description(self):
-		return "<p>" + self.properties[self.KEY_DESCRIPTION] + "</p>"
+			if stack:
+				stack[-1]["phases"].append(record)
+			else:
+				self.local.records.append(record)
 
-	def build_summary(self):
-		return "<div class=\"" + self.CLASS_SUMMARY + "\">" + self.build_title() + self.build_description() + "</div>"
+	def pop_records(self):
+		self.get_stack()
 
-	def build_preview(self):
-		return "<div class=\"" + self.CLASS_PREVIEW + "\">" + self.build_summary() + self.build_image() + "</div>"
+		records = self.local.records
+		self.local.records = []
 
-	def build_link(self, text, target):
-		return "<a href=\"" + target + "\" target=\"_blank\" ><div class=\"" + self.CLASS_LINK + "\">" + text + "</div></a>"
+		return records
 
-	def build_link_view(self):
-		return self.build_link(self.TEXT_VIEW, self.properties[self.KEY_URL])
+	def write_report(self, file, total):
+		report = {
+			"time": total,
+			"phases": self.pop_records()
+		}
 
-	def build_link_source(self):
-		return self.build_link(self.TEXT_SOURCE, self.properties[self.KEY_SOURCE])
+		report_file = open(file, "w")
+		json.dump(report, report_file, indent="\t")
+		report_file.close()
 
-	def build_links(self):
-		return "<div class=\"" + self.CLASS_LINKS + "\">" + self.build_link_view() + self.build_link_source() + "</div>"
 
-	def build(self):
-		self.site.log("Building sketch \"" + self.properties[self.KEY_TITLE] + "\"")
+profiler = Profiler()
 
-		return "<div class=\"" + self.CLASS + "\">" + self.build_preview() + self.build_links() + "</div>"
+def read_image_size(file):
+	image_file = open(file, "rb")
+	header = image_file.read(32)
 
+	try:
+		if header.startswith(b"\x89PNG\r\n\x1a\n"):
+			return struct.unpack(">II", header[16:24])
 
-class Site:
-	URL = "https://jobtalle.com/"
+		if header[:6] == b"GIF87a" or header[:6] == b"GIF89a":
+			return struct.unpack("<HH", header[6:10])
 
-	LOCALE = "en_US"
+		if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+			if len(header) < 30:
+				return None
 
-	TITLE = "Job Talle"
-	TITLE_DIVISOR = " | "
+			chunk = header[12:16]
 
-	DESCRIPTION = "A blog about software development, AI & Algorithms"
+			if chunk == b"VP8 ":
+				width, height = struct.unpack("<HH", header[26:30])
 
-	DIR_POSTS = "posts"
-	DIR_SKETCHES = "sketches"
-	DIR_GAMES = "games"
-	DIR_WORK = "work"
-	DIR_JAVASCRIPT = "js"
-	DIR_TEMPLATES = "templates"
+				return width & 0x3fff, height & 0x3fff
 
-	FILE_TEMPLATE = "template.html"
-	FILE_LOADMORE = "loadmore.html"
+			if chunk == b"VP8L":
+				bits = struct.unpack("<I", header[21:25])[0]
 
-	KEY_TITLE = "$title$"
-	KEY_ADDITIONAL_CSS = "$additional-css$"
+				return (bits & 0x3fff) + 1, ((bits >> 14) & 0x3fff) + 1
+
+			if chunk == b"VP8X":
+				return 1 + int.from_bytes(header[24:27], "little"), 1 + int.from_bytes(header[27:30], "little")
+
+			return None
+
+		if header[:2] == b"\xff\xd8":
+			image_file.seek(2)
+
+			while True:
+				marker = image_file.read(2)
+
+				if len(marker) < 2 or marker[0] != 0xff:
+					return None
+
+				while marker[1] == 0xff:
+					marker = marker[1:] + image_file.read(1)
+
+					if len(marker) < 2:
+						return None
+
+				code = marker[1]
+
+				if code == 0x01 or 0xd0 <= code <= 0xd8:
+					continue
+
+				length = struct.unpack(">H", image_file.read(2))[0]
+
+				if 0xc0 <= code <= 0xcf and code not in [0xc4, 0xc8, 0xcc]:
+					height, width = struct.unpack(">HH", image_file.read(5)[1:5])
+
+					return width, height
+
+				image_file.seek(length - 2, 1)
+	except struct.error:
+		return None
+	finally:
+		image_file.close()
+
+	return None
+
+def hash_string(string):
+	return hashlib.sha1(string.encode("utf-8")).hexdigest()
+
+def get_temporary_file(file):
+	return file + ".tmp"
+
+def replace_file(file, temporary):
+	if os.path.isfile(file) and filecmp.cmp(file, temporary, shallow=False):
+		os.remove(temporary)
+
+		return False
+
+	os.replace(temporary, file)
+
+	return True
+
+
+class ResourceCache:
+	def __init__(self):
+		self.contents = {}
+		self.hashes = {}
+
+	def read(self, file):
+		modified = os.stat(file).st_mtime_ns
+		entry = self.contents.get(file)
+
+		if entry is None or entry[0] != modified:
+			resource_file = open(file)
+			entry = (modified, resource_file.read())
+			resource_file.close()
+
+			profiler.count("bytes_read", os.path.getsize(file))
+
+			self.contents[file] = entry
+
+		return entry[1]
+
+	def hash(self, file):
+		modified = os.stat(file).st_mtime_ns
+		entry = self.hashes.get(file)
+
+		if entry is None or entry[0] != modified:
+			hashed_file = open(file, "rb")
+			data = hashed_file.read()
+			entry = (modified, hashlib.sha1(data).hexdigest())
+			hashed_file.close()
+
+			profiler.count("bytes_read", len(data))
+
+			self.hashes[file] = entry
+
+		return entry[1]
+
+
+resources = ResourceCache()
+
+
+class Template:
+	REGEX_KEY = re.compile("\\$[a-z\\-]+\\$")
+	REGEX_SVG = re.compile("<svg\\b([^>]*)>(.*)</svg>", re.DOTALL)
+	REGEX_VIEW_BOX = re.compile("\\sviewBox=\"([^\"]*)\"")
+	REGEX_SVG_NOISE = re.compile("<\\?xml[^>]*\\?>|<!--.*?-->", re.DOTALL)
+	REGEX_SVG_WHITESPACE = re.compile(">\\s+<")
+
+	PREFIX_ICON = "$icon-"
+
+	ICONS_INLINE = "inline"
+	ICONS_SPRITE = "sprite"
+	ICONS_DEFS = "defs"
+	ICONS = [ICONS_INLINE, ICONS_SPRITE, ICONS_DEFS]
+
+	FILE_SPRITE = "icons.svg"
+
+	TAG_BODY = "<body>"
+
+	def __init__(self, file, icons=ICONS_INLINE):
+		self.file = file
+		self.mode = icons
+		self.segments = []
+		self.slots = []
+		self.icons = []
+		self.icon_bytes_saved = 0
+
+		self.compile(resources.read(file))
+
+	@staticmethod
+	def get_icon_file(key):
+		return "img/ico_" + key[len(Template.PREFIX_ICON):-1] + ".svg"
+
+	@staticmethod
+	def get_icon_id(file):
+		return os.path.splitext(os.path.basename(file))[0]
+
+	def parse_icon(self, file):
+		match = self.REGEX_SVG.search(self.REGEX_SVG_NOISE.sub("", resources.read(file)))
+		view_box = self.REGEX_VIEW_BOX.search(match.group(1))
+
+		return view_box.group(1) if view_box is not None else None, self.REGEX_SVG_WHITESPACE.sub("><", match.group(2).strip())
+
+	def get_symbol(self, file):
+		view_box, content = self.parse_icon(file)
+
+		return "<symbol id=\"" + self.get_icon_id(file) + "\"" + (" viewBox=\"" + view_box + "\"" if view_box is not None else "") + ">" + content + "</symbol>"
+
+	def get_sprite(self):
+		return "<svg xmlns=\"http://www.w3.org/2000/svg\">" + "".join(self.get_symbol(file) for file in sorted(set(self.icons))) + "</svg>"
+
+	def get_icon(self, file, repeated):
+		if self.mode == self.ICONS_INLINE:
+			return resources.read(file)
+
+		view_box, content = self.parse_icon(file)
+		svg = "<svg" + (" viewBox=\"" + view_box + "\"" if view_box is not None else "") + ">"
+
+		if self.mode == self.ICONS_SPRITE:
+			return svg + "<use href=\"" + self.FILE_SPRITE + "#" + self.get_icon_id(file) + "\"/></svg>"
+
+		if repeated:
+			return svg + "<use href=\"#" + self.get_icon_id(file) + "\"/></svg>"
+
+		return svg + content + "</svg>"
+
+	def compile(self, source):
+		position = 0
+		keys = self.REGEX_KEY.findall(source)
+		repeated = sorted(set(self.get_icon_file(key) for key in keys if key.startswith(self.PREFIX_ICON) and keys.count(key) > 1))
+
+		if self.mode == self.ICONS_DEFS and repeated:
+			defs = "<svg style=\"display:none\"><defs>" + "".join(self.get_symbol(file) for file in repeated) + "</defs></svg>"
+			source = source.replace(self.TAG_BODY, self.TAG_BODY + defs, 1)
+
+			self.icon_bytes_saved = self.icon_bytes_saved - len(defs)
+
+		for match in self.REGEX_KEY.finditer(source):
+			self.segments.append(source[position:match.start()])
+
+			key = match.group(0)
+
+			if key.startswith(self.PREFIX_ICON):
+				icon = self.get_icon(self.get_icon_file(key), self.get_icon_file(key) in repeated)
+
+				self.icons.append(self.get_icon_file(key))
+				self.segments.append(icon)
+
+				self.icon_bytes_saved = self.icon_bytes_saved + len(resources.read(self.get_icon_file(key))) - len(icon)
+			else:
+				self.slots.append((len(self.segments), key))
+				self.segments.append(key)
+
+			position = match.end()
+
+		self.segments.append(source[position:])
+
+	def render(self, values):
+		parts = list(self.segments)
+
+		for index, key in self.slots:
+			if key in values:
+				parts[index] = values[key]
+
+		return "".join(parts)
+
+	def stream(self, values):
+		slots = dict(self.slots)
+
+		for index, segment in enumerate(self.segments):
+			if index in slots and slots[index] in values:
+				value = values[slots[index]]
+
+				if isinstance(value, str):
+					yield value
+				else:
+					yield from value
+			else:
+				yield segment
+
+
+class FeatureScanner(html.parser.HTMLParser):
+	FEATURE_MATH = "math"
+	FEATURE_CODE = "code"
+
+	CLASS_PRETTIFY = "prettyprint"
+
+	DELIMITERS = ["$$", "$"]
+
+	IGNORED_TAGS = [
+		"script",
+		"noscript",
+		"style",
+		"textarea",
+		"pre",
+		"code"
+	]
+
+	def __init__(self):
+		super().__init__(convert_charrefs=True)
+
+		self.ignored = 0
+		self.features = set()
+
+	@staticmethod
+	def find_end_of_math(delimiter, text, index):
+		braces = 0
+
+		while index < len(text):
+			if braces <= 0 and text.startswith(delimiter, index):
+				return index
+			elif text[index] == "\\":
+				index = index + 1
+			elif text[index] == "{":
+				braces = braces + 1
+			elif text[index] == "}":
+				braces = braces - 1
+
+			index = index + 1
+
+		return -1
+
+	@staticmethod
+	def has_math(text):
+		pieces = [text]
+
+		for delimiter in FeatureScanner.DELIMITERS:
+			split = []
+
+			for piece in pieces:
+				start = piece.find(delimiter)
+
+				if start == -1:
+					split.append(piece)
+				elif FeatureScanner.find_end_of_math(delimiter, piece, start + len(delimiter)) != -1:
+					return True
+				else:
+					split.extend([piece[:start], piece[start:]])
+
+			pieces = split
+
+		return False
+
+	def check_classes(self, attributes):
+		for name, value in attributes:
+			if name == "class" and value is not None and self.CLASS_PRETTIFY in value.split():
+				self.features.add(self.FEATURE_CODE)
+
+	def handle_starttag(self, tag, attributes):
+		self.check_classes(attributes)
+
+		if tag in self.IGNORED_TAGS:
+			self.ignored = self.ignored + 1
+
+	def handle_startendtag(self, tag, attributes):
+		self.check_classes(attributes)
+
+	def handle_endtag(self, tag):
+		if tag in self.IGNORED_TAGS and self.ignored > 0:
+			self.ignored = self.ignored - 1
+
+	def handle_data(self, data):
+		if self.ignored == 0 and self.FEATURE_MATH not in self.features and self.has_math(data):
+			self.features.add(self.FEATURE_MATH)
+
+	def scan(self, content):
+		self.feed(content)
+		self.close()
+
+		return self.features
+
+
+class Element:
+	def __init__(self, tag, attributes, parent):
+		self.tag = tag
+		self.attributes = {name: value if value is not None else "" for name, value in attributes}
+		self.classes = set(self.attributes.get("class", "").split())
+		self.parent = parent
+		self.previous = None
+		self.next = None
+		self.last_child = None
+
+		if parent is not None:
+			self.previous = parent.last_child
+
+			if self.previous is not None:
+				self.previous.next = self
+
+			parent.last_child = self
+
+
+class ElementParser(html.parser.HTMLParser):
+	VOID_ELEMENTS = [
+		"area",
+		"base",
+		"br",
+		"col",
+		"embed",
+		"hr",
+		"img",
+		"input",
+		"link",
+		"meta",
+		"source",
+		"track",
+		"wbr"
+	]
+
+	def __init__(self):
+		super().__init__(convert_charrefs=True)
+
+		self.root = Element("#document", [], None)
+		self.stack = [self.root]
+		self.elements = []
+
+	def add_element(self, tag, attributes):
+		element = Element(tag, attributes, self.stack[-1])
+
+		self.elements.append(element)
+
+		return element
+
+	def handle_starttag(self, tag, attributes):
+		element = self.add_element(tag, attributes)
+
+		if tag not in self.VOID_ELEMENTS:
+			self.stack.append(element)
+
+	def handle_startendtag(self, tag, attributes):
+		self.add_element(tag, attributes)
+
+	def handle_endtag(self, tag):
+		for index in range(len(self.stack) - 1, 0, -1):
+			if self.stack[index].tag == tag:
+				del self.stack[index:]
+
+				return
+
+	def parse(self, page):
+		self.feed(page)
+		self.close()
+
+		return self.elements
+
+
+class CriticalCSS:
+	REGEX_SIMPLE = re.compile("(\\*|[A-Za-z][\\w-]*)|#([\\w-]+)|\\.([\\w-]+)|\\[\\s*([\\w-]+)\\s*(?:([~|^$*]?=)\\s*(\"[^\"]*\"|'[^']*'|[^\\]\\s]+)\\s*)?\\]|(::?)([\\w-]+)(\\((?:[^()]|\\([^()]*\\))*\\))?")
+
+	BLOCK_AT_RULES = ["@media", "@supports"]
+
+	def __init__(self, file):
+		self.file = file
+		self.rules = self.parse_rules(Minifier.minify_css(resources.read(file)))
+		self.selectors = {}
+
+	@staticmethod
+	def find_block_end(css, start):
+		depth = 0
+		quote = None
+		index = start
+
+		while index < len(css):
+			character = css[index]
+
+			if quote is not None:
+				if character == "\\":
+					index = index + 1
+				elif character == quote:
+					quote = None
+			elif character == "\"" or character == "'":
+				quote = character
+			elif character == "{":
+				depth = depth + 1
+			elif character == "}":
+				depth = depth - 1
+
+				if depth == 0:
+					return index
+
+			index = index + 1
+
+		return len(css)
+
+	@staticmethod
+	def parse_rules(css):
+		rules = []
+		position = 0
+
+		while position < len(css):
+			brace = css.find("{", position)
+			semicolon = css.find(";", position)
+
+			if brace == -1:
+				break
+
+			if semicolon != -1 and semicolon < brace:
+				if css[position:semicolon].strip().startswith("@"):
+					rules.append((css[position:semicolon + 1].strip(), None))
+
+				position = semicolon + 1
+
+				continue
+
+			prelude = css[position:brace].strip()
+			end = CriticalCSS.find_block_end(css, brace)
+			body = css[brace + 1:end]
+
+			if prelude.startswith(tuple(CriticalCSS.BLOCK_AT_RULES)):
+				rules.append((prelude, CriticalCSS.parse_rules(body)))
+			else:
+				rules.append((prelude, body))
+
+			position = end + 1
+
+		return rules
+
+	@staticmethod
+	def split(text, separators):
+		parts = []
+		current = ""
+		depth = 0
+
+		for character in text:
+			if character in "([":
+				depth = depth + 1
+			elif character in ")]":
+				depth = depth - 1
+
+			if depth == 0 and character in separators:
+				parts.append(current)
+				parts.append(character)
+				current = ""
+			else:
+				current = current + character
+
+		parts.append(current)
+
+		return parts
+
+	def parse_compound(self, compound):
+		tests = []
+		position = 0
+
+		while position < len(compound):
+			match = self.REGEX_SIMPLE.match(compound, position)
+
+			if match is None or match.end() == position:
+				return None
+
+			tests.append(match.groups())
+			position = match.end()
+
+		return tests
+
+	def parse_selector(self, selector):
+		if selector in self.selectors:
+			return self.selectors[selector]
+
+		compounds = []
+		combinators = []
+		combinator = None
+
+		for part in self.split(selector.strip(), " >+~"):
+			if part in [" ", ">", "+", "~"]:
+				if compounds and (combinator is None or combinator == " "):
+					combinator = part
+			elif part:
+				tests = self.parse_compound(part)
+
+				if tests is None:
+					compounds = None
+
+					break
+
+				if compounds:
+					combinators.append(combinator)
+
+				compounds.append(tests)
+				combinator = None
+
+		self.selectors[selector] = (compounds, combinators)
+
+		return compounds, combinators
+
+	@staticmethod
+	def match_attribute(element, name, operator, value):
+		if name not in element.attributes:
+			return False
+
+		if operator is None:
+			return True
+
+		if value[0] == "\"" or value[0] == "'":
+			value = value[1:-1]
+
+		attribute = element.attributes[name]
+
+		if operator == "=":
+			return attribute == value
+		elif operator == "~=":
+			return value in attribute.split()
+		elif operator == "|=":
+			return attribute == value or attribute.startswith(value + "-")
+		elif operator == "^=":
+			return attribute.startswith(value)
+		elif operator == "$=":
+			return attribute.endswith(value)
+
+		return value in attribute
+
+	@staticmethod
+	def match_compound(element, tests):
+		for tag, id, cls, attribute, operator, value, colons, pseudo, arguments in tests:
+			if tag is not None:
+				if tag != "*" and element.tag != tag.lower():
+					return False
+			elif id is not None:
+				if element.attributes.get("id") != id:
+					return False
+			elif cls is not None:
+				if cls not in element.classes:
+					return False
+			elif attribute is not None:
+				if not CriticalCSS.match_attribute(element, attribute.lower(), operator, value):
+					return False
+			elif colons == ":" and arguments is None:
+				if pseudo == "first-child" and element.previous is not None or\
+					pseudo == "last-child" and element.next is not None or\
+					pseudo == "only-child" and (element.previous is not None or element.next is not None) or\
+					pseudo == "root" and element.tag != "html":
+					return False
+
+		return True
+
+	def match(self, element, compounds, combinators, index):
+		if not self.match_compound(element, compounds[index]):
+			return False
+
+		if index == 0:
+			return True
+
+		combinator = combinators[index - 1]
+
+		if combinator == ">":
+			return element.parent is not None and self.match(element.parent, compounds, combinators, index - 1)
+
+		if combinator == "+":
+			return element.previous is not None and self.match(element.previous, compounds, combinators, index - 1)
+
+		if combinator == "~":
+			relative = element.previous
+		else:
+			relative = element.parent
+
+		while relative is not None:
+			if self.match(relative, compounds, combinators, index - 1):
+				return True
+
+			if combinator == "~":
+				relative = relative.previous
+			else:
+				relative = relative.parent
+
+		return False
+
+	@staticmethod
+	def index_elements(elements):
+		index = {}
+
+		for element in elements:
+			for key in [element.tag] + ["." + cls for cls in element.classes] + (["#" + element.attributes["id"]] if "id" in element.attributes else []):
+				index.setdefault(key, []).append(element)
+
+		return index
+
+	@staticmethod
+	def get_candidates(tests, elements, index):
+		for tag, id, cls, attribute, operator, value, colons, pseudo, arguments in tests:
+			if id is not None:
+				return index.get("#" + id, [])
+			elif cls is not None:
+				return index.get("." + cls, [])
+			elif tag is not None and tag != "*":
+				return index.get(tag.lower(), [])
+
+		return elements
+
+	def is_used(self, selector, elements, index):
+		compounds, combinators = self.parse_selector(selector)
+
+		if not compounds:
+			return True
+
+		candidates = self.get_candidates(compounds[-1], elements, index)
+
+		return any(self.match(element, compounds, combinators, len(compounds) - 1) for element in candidates)
+
+	def select(self, rules, elements, index):
+		result = ""
+
+		for prelude, body in rules:
+			if body is None:
+				result += prelude
+			elif isinstance(body, list):
+				selected = self.select(body, elements, index)
+
+				if selected:
+					result += prelude + "{" + selected + "}"
+			elif prelude.startswith("@"):
+				result += prelude + "{" + body + "}"
+			else:
+				selectors = [selector for selector in self.split(prelude, ",") if selector != "," and self.is_used(selector, elements, index)]
+
+				if selectors:
+					result += ",".join(selector.strip() for selector in selectors) + "{" + body + "}"
+
+		return result
+
+	def extract(self, page):
+		elements = ElementParser().parse(page)
+
+		return self.select(self.rules, elements, self.index_elements(elements))
+
+
+class TextExtractor(html.parser.HTMLParser):
+	IGNORED_TAGS = [
+		"script",
+		"style"
+	]
+
+	def __init__(self):
+		super().__init__(convert_charrefs=True)
+
+		self.ignored = 0
+		self.text = []
+
+	def handle_starttag(self, tag, attributes):
+		if tag in self.IGNORED_TAGS:
+			self.ignored = self.ignored + 1
+
+	def handle_endtag(self, tag):
+		if tag in self.IGNORED_TAGS and self.ignored > 0:
+			self.ignored = self.ignored - 1
+
+	def handle_data(self, data):
+		if self.ignored == 0:
+			self.text.append(data)
+
+	def extract(self, content):
+		self.feed(content)
+		self.close()
+
+		return " ".join(self.text)
+
+
+class SearchIndex:
+	DIR = "search"
+	FILE_INDEX = "index.json"
+
+	PREFIX_LENGTH = 1
+	HASH_LENGTH = 8
+
+	TERM_LENGTH_MIN = 2
+	TERM_LENGTH_MAX = 32
+	STEM_LENGTH_MIN = 3
+
+	REGEX_TERM = re.compile("[a-z0-9]+")
+
+	SUFFIXES = [
+		["ational", "ate"],
+		["tional", "tion"],
+		["ization", "ize"],
+		["fulness", "ful"],
+		["ousness", "ous"],
+		["iveness", "ive"],
+		["ations", "ate"],
+		["ation", "ate"],
+		["ingly", ""],
+		["edly", ""],
+		["ings", ""],
+		["ing", ""],
+		["ies", "y"],
+		["ied", "y"],
+		["ed", ""],
+		["ly", ""],
+		["ss", "ss"],
+		["s", ""]
+	]
+
+	STOPWORDS = [
+		"a", "an", "and", "are", "as", "at", "be", "but", "by", "can", "for", "from", "has", "have", "if", "in",
+		"into", "is", "it", "its", "of", "on", "or", "so", "such", "than", "that", "the", "their", "then", "there",
+		"these", "this", "to", "was", "were", "which", "will", "with"
+	]
+
+	@staticmethod
+	def stem(term):
+		for suffix, replacement in SearchIndex.SUFFIXES:
+			if term.endswith(suffix) and len(term) - len(suffix) >= SearchIndex.STEM_LENGTH_MIN:
+				return term[:len(term) - len(suffix)] + replacement
+
+		return term
+
+	@staticmethod
+	def get_terms(text):
+		terms = {}
+
+		for term in SearchIndex.REGEX_TERM.findall(text.lower()):
+			if len(term) < SearchIndex.TERM_LENGTH_MIN or len(term) > SearchIndex.TERM_LENGTH_MAX or term in SearchIndex.STOPWORDS:
+				continue
+
+			term = SearchIndex.stem(term)
+			terms[term] = terms.get(term, 0) + 1
+
+		return terms
+
+	@staticmethod
+	def encode_postings(postings):
+		encoded = []
+		previous = 0
+
+		for document, frequency in sorted(postings):
+			encoded.append(document - previous)
+			encoded.append(frequency)
+			previous = document
+
+		return encoded
+
+	@staticmethod
+	def build_shards(documents):
+		postings = {}
+
+		for document, terms in enumerate(documents):
+			for term, frequency in terms.items():
+				postings.setdefault(term, []).append((document, frequency))
+
+		shards = {}
+
+		for term in sorted(postings):
+			shards.setdefault(term[:SearchIndex.PREFIX_LENGTH], {})[term] = SearchIndex.encode_postings(postings[term])
+
+		return shards
+
+
+class RelatedPosts:
+	EXACT_LIMIT = 2000
+	TERMS_LIMIT = 64
+
+	SIGNATURE_LENGTH = 64
+	BAND_ROWS = 2
+	BUCKET_LIMIT = 32
+
+	SCORE_PRECISION = 6
+
+	@staticmethod
+	def get_vectors(documents):
+		frequencies = {}
+
+		for terms in documents:
+			for term in terms:
+				frequencies[term] = frequencies.get(term, 0) + 1
+
+		vectors = []
+
+		for terms in documents:
+			weights = sorted(((-frequency * math.log(len(documents) / frequencies[term]), term) for term, frequency in terms.items()))
+			weights = [[term, -weight] for weight, term in weights[:RelatedPosts.TERMS_LIMIT] if weight < 0]
+			norm = math.sqrt(sum(weight * weight for term, weight in weights))
+
+			vectors.append({term: weight / norm for term, weight in weights})
+
+		return vectors
+
+	@staticmethod
+	def get_signature(terms):
+		signature = [None] * RelatedPosts.SIGNATURE_LENGTH
+
+		for term in terms:
+			value = int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "little")
+			bin = value % RelatedPosts.SIGNATURE_LENGTH
+			value //= RelatedPosts.SIGNATURE_LENGTH
+
+			if signature[bin] is None or value < signature[bin]:
+				signature[bin] = value
+
+		return signature
+
+	@staticmethod
+	def select(index, scores, count):
+		ranked = []
+
+		for other, score in scores.items():
+			score = round(score, RelatedPosts.SCORE_PRECISION)
+
+			if other != index and score > 0:
+				ranked.append((-score, other))
+
+		return [other for score, other in heapq.nsmallest(count, ranked)]
+
+	@staticmethod
+	def find_exact(vectors, count):
+		postings = {}
+
+		for index, vector in enumerate(vectors):
+			for term, weight in vector.items():
+				postings.setdefault(term, []).append((index, weight))
+
+		shared = [entries for entries in postings.values() if len(entries) > 1]
+
+		if numpy is not None:
+			similarity = numpy.zeros((len(vectors), len(vectors)))
+
+			for entries in shared:
+				indices = numpy.array([entry[0] for entry in entries])
+				weights = numpy.array([entry[1] for entry in entries])
+
+				similarity[numpy.ix_(indices, indices)] += numpy.outer(weights, weights)
+
+			similarity = numpy.round(similarity, RelatedPosts.SCORE_PRECISION)
+			numpy.fill_diagonal(similarity, 0)
+			related = []
+
+			for row in similarity:
+				others = numpy.flatnonzero(row > 0)
+
+				related.append([int(other) for other in others[numpy.lexsort((others, -row[others]))[:count]]])
+
+			return related
+
+		scores = [{} for vector in vectors]
+
+		for entries in shared:
+			for index, weight in entries:
+				for other, other_weight in entries:
+					scores[index][other] = scores[index].get(other, 0) + weight * other_weight
+
+		return [RelatedPosts.select(index, scores[index], count) for index in range(len(vectors))]
+
+	@staticmethod
+	def find_candidates(signatures):
+		buckets = {}
+
+		for index, signature in enumerate(signatures):
+			for band in range(0, len(signature), RelatedPosts.BAND_ROWS):
+				rows = tuple(signature[band:band + RelatedPosts.BAND_ROWS])
+
+				if None not in rows:
+					buckets.setdefault((band, rows), []).append(index)
+
+		candidates = [set() for signature in signatures]
+
+		for bucket in buckets.values():
+			if len(bucket) > RelatedPosts.BUCKET_LIMIT:
+				continue
+
+			for index in bucket:
+				candidates[index].update(bucket)
+
+		return candidates
+
+	@staticmethod
+	def find_approximate(vectors, signatures, count):
+		related = []
+
+		for index, candidates in enumerate(RelatedPosts.find_candidates(signatures)):
+			scores = {}
+
+			for other in candidates:
+				scores[other] = sum(weight * vectors[other].get(term, 0) for term, weight in vectors[index].items())
+
+			related.append(RelatedPosts.select(index, scores, count))
+
+		return related
+
+
+class Post:
+	FILE_CONTENT = "content.html"
+	FILE_PROPERTIES = "properties.json"
+	FILE_KATEX_CSS = "katex_css.html"
+	FILE_KATEX_SCRIPT = "katex_script.html"
+	FILE_PRETTIFY = "prettify.html"
+
+	PROPERTY_TITLE = "title"
+	PROPERTY_ABSTRACT = "abstract"
+	PROPERTY_PREVIEW = "preview"
+
+	DIR_JAVASCRIPT = "js"
+	DIR_CSS = "css"
+
+	CLASS_POST_LINK = "post-link"
+	CLASS_POST_REFERENCE = "post-reference"
+	CLASS_POST_REFERENCE_LEFT = "post-reference-left"
+	CLASS_POST_REFERENCE_RIGHT = "post-reference-right"
+
+	ID_REFERENCES = "references"
+	ID_RELATED = "related"
+
+	EAGER_IMAGES = 1
+
+	REGEX_LOCAL_IMAGE = re.compile("<img\\s[^>]*?local src=\"([^\"]*)\"")
+	REGEX_LOCAL_SCRIPT = re.compile("<script local src=\"([^\"]*)\"")
+	REGEX_SCRIPTS = re.compile("(?:<script src=\"[^\"]*\"></script>\\s*){2,}")
+	REGEX_SCRIPT_SOURCE = re.compile("<script src=\"([^\"]*)\"></script>")
+
+	DAY_ABBREVIATIONS = [
+		"Mon",
+		"Tue",
+		"Wed",
+		"Thu",
+		"Fri",
+		"Sat",
+		"Sun"
+	]
+
+	MONTH_ABBREVIATIONS = [
+		"Jan",
+		"Feb",
+		"Mar",
+		"Apr",
+		"May",
+		"Jun",
+		"Jul",
+		"Aug",
+		"Sep",
+		"Oct",
+		"Nov",
+		"Dec"
+	]
+
+	def __init__(self, site, directory, properties=None):
+		self.site = site
+		self.directory = directory
+		self.content = Site.DIR_POSTS + "/" + directory + "/" + self.FILE_CONTENT
+		self.properties_file = self.get_properties_file(directory)
+		self.properties = properties
+
+		self.validate_requirements()
+
+		if self.properties is None:
+			self.read_properties()
+
+	@staticmethod
+	def get_properties_file(directory):
+		return Site.DIR_POSTS + "/" + directory + "/" + Post.FILE_PROPERTIES
+
+	@staticmethod
+	def get_katex_css():
+		return resources.read(Site.DIR_TEMPLATES + "/" + Post.FILE_KATEX_CSS)
+
+	@staticmethod
+	def get_katex_script():
+		return resources.read(Site.DIR_TEMPLATES + "/" + Post.FILE_KATEX_SCRIPT)
+
+	@staticmethod
+	def get_prettify():
+		return resources.read(Site.DIR_TEMPLATES + "/" + Post.FILE_PRETTIFY)
+
+	def get_content(self, previous, next, related):
+		content = self.get_post_header(self.properties[self.PROPERTY_TITLE]) + resources.read(self.content) + self.build_related(related) + self.build_neighbors(previous, next)
+
+		content = content.replace("local src=\"", "src=\"" + self.site.DIR_POSTS + "/" + self.directory + "/").replace("local href=\"", "href=\"" + self.site.DIR_POSTS + "/" + self.directory + "/")
+
+		if self.site.options.bundle:
+			content = self.bundle_scripts(content)
+
+		return self.site.add_image_attributes(content, self.EAGER_IMAGES)
+
+	def get_feed_content(self):
+		directory = self.site.URL + Site.DIR_POSTS + "/" + self.directory + "/"
+
+		return resources.read(self.content).replace("local src=\"", "src=\"" + directory).replace("local href=\"", "href=\"" + directory)
+
+	def get_images(self):
+		directory = Site.DIR_POSTS + "/" + self.directory + "/"
+
+		return [directory + file for file in self.REGEX_LOCAL_IMAGE.findall(resources.read(self.content)) if os.path.isfile(directory + file)]
+
+	def get_search_digest(self):
+		return self.site.hash_files([__file__, self.content, self.properties_file])
+
+	def get_search_terms(self):
+		digest = self.get_search_digest()
+		cached = self.site.manifest.get(Manifest.TABLE_TERMS, self.directory)
+
+		if cached is not None and cached[0] == digest:
+			return cached[1]
+
+		terms = SearchIndex.get_terms(
+			self.properties[self.PROPERTY_TITLE] + " " +
+			self.properties[self.PROPERTY_ABSTRACT] + " " +
+			TextExtractor().extract(resources.read(self.content)))
+
+		self.site.manifest.set(Manifest.TABLE_TERMS, self.directory, [digest, terms])
+
+		return terms
+
+	def get_signature(self):
+		digest = self.get_search_digest()
+		cached = self.site.manifest.get(Manifest.TABLE_SIGNATURES, self.directory)
+
+		if cached is not None and cached[0] == digest:
+			return cached[1]
+
+		signature = RelatedPosts.get_signature(self.get_search_terms())
+
+		self.site.manifest.set(Manifest.TABLE_SIGNATURES, self.directory, [digest, signature])
+
+		return signature
+
+	def get_features(self, content):
+		digest = hash_string(content)
+		cached = self.site.manifest.get(Manifest.TABLE_FEATURES, self.directory)
+
+		if cached is not None and cached[0] == digest:
+			return set(cached[1:])
+
+		features = FeatureScanner().scan(content)
+
+		self.site.manifest.set(Manifest.TABLE_FEATURES, self.directory, [digest] + sorted(features))
+
+		return features
+
+	def get_dependencies(self, previous, next, related):
+		dependencies = self.site.get_template_dependencies()
+		dependencies[self.content] = self.site.hash_file(self.content)
+		dependencies[self.properties_file] = self.site.hash_file(self.properties_file)
+		if self.site.options.bundle:
+			dependencies[self.get_css_directory()] = self.site.hash_files(self.get_css_files())
+			dependencies[Site.DIR_POSTS + "/" + self.directory + "/" + self.DIR_JAVASCRIPT] = self.site.hash_files(self.get_scripts())
+		else:
+			dependencies[self.get_css_directory()] = " ".join(self.get_css_files())
+
+		for image in self.get_images():
+			dependencies[image] = self.site.hash_file(image)
+
+		for file in [self.FILE_KATEX_CSS, self.FILE_KATEX_SCRIPT, self.FILE_PRETTIFY]:
+			dependencies[Site.DIR_TEMPLATES + "/" + file] = self.site.hash_file(Site.DIR_TEMPLATES + "/" + file)
+
+		for neighbor in [previous, next]:
+			if neighbor is not None:
+				dependencies[neighbor.properties_file] = self.site.hash_file(neighbor.properties_file)
+
+		if self.site.options.related:
+			dependencies["$related$"] = " ".join(post.directory for post in related)
+
+			for post in related:
+				dependencies[post.properties_file] = self.site.hash_file(post.properties_file)
+
+		return dependencies
+
+	def build(self, previous, next, related):
+		dependencies = self.get_dependencies(previous, next, related)
+
+		if self.site.is_current(self.get_post_file_name(), dependencies):
+			self.site.log("Skipping " + self.get_post_file_name() + ", it is up to date")
+			self.get_post_link()
+
+			return
+
+		self.site.log("Building " + self.get_post_file_name())
+		self.site.log_scope_increment()
+
+		self.bundles = {}
+
+		with profiler.phase("get_content"):
+			content = self.get_content(previous, next, related)
+
+		with profiler.phase("get_features"):
+			features = self.get_features(content)
+
+		self.site.log("Features: " + (", ".join(sorted(features)) if features else "none"))
+
+		if FeatureScanner.FEATURE_MATH in features:
+			post_script = self.get_katex_script()
+			additional_css = self.get_css() + self.get_katex_css()
+		else:
+			post_script = ""
+			additional_css = self.get_css()
+
+		if FeatureScanner.FEATURE_CODE in features:
+			post_script += self.get_prettify()
+
+		with profiler.phase("render"):
+			result = self.site.render_page(self.get_post_file_name(), {
+				self.site.KEY_TITLE: self.site.TITLE + self.site.TITLE_DIVISOR + self.properties[self.PROPERTY_TITLE],
+				self.site.KEY_DESCRIPTION: self.properties[self.PROPERTY_ABSTRACT],
+				self.site.KEY_ADDITIONAL_CSS: additional_css,
+				self.site.KEY_MENU_BUTTONS: self.site.build_menu(),
+				self.site.KEY_CONTENT: content,
+				self.site.KEY_POST_SCRIPT: post_script,
+				self.site.KEY_YEAR: self.site.get_year(),
+				self.site.KEY_META: self.get_meta() + self.site.get_hints(
+					self.get_post_file_name(),
+					self.site.get_eager_images(content, self.EAGER_IMAGES),
+					[neighbor.get_post_file_name() for neighbor in [next, previous] if neighbor is not None])
+				})
+
+		self.site.write(self.get_post_file_name(), [result])
+
+		self.site.manifest.set(Manifest.TABLE_BUNDLES, self.get_post_file_name(), self.bundles)
+		self.site.record(self.get_post_file_name(), dependencies)
+		self.get_post_link()
+		self.site.log_scope_decrement()
+
+	def make_meta(self, property, content):
+		return "<meta property=\"" + property + "\" content=\"" + content + "\"/>"
+
+	def get_meta(self):
+		return \
+			self.make_meta("og:title", self.properties[self.PROPERTY_TITLE]) +\
+			self.make_meta("og:url", self.site.URL + self.get_post_file_name()) +\
+			self.make_meta("og:description", self.properties[self.PROPERTY_ABSTRACT]) +\
+			self.make_meta("og:image", self.site.URL + self.site.DIR_POSTS + "/" + self.directory + "/" + self.properties[self.PROPERTY_PREVIEW]) +\
+			self.make_meta("twitter:image", self.site.URL + self.site.DIR_POSTS + "/" + self.directory + "/" + self.properties[self.PROPERTY_PREVIEW]) +\
+			self.make_meta("twitter:description", self.properties[self.PROPERTY_ABSTRACT]) + self.make_meta("twitter:site", "jobtalle.com") +\
+			self.make_meta("twitter:card", "summary") + self.make_meta("twitter:title", self.properties[self.PROPERTY_TITLE])
+
+	def get_css_directory(self):
+		return Site.DIR_POSTS + "/" + self.directory + "/" + self.DIR_CSS
+
+	def get_css_files(self):
+		dir = self.get_css_directory()
+
+		if not os.path.isdir(dir):
+			return []
+
+		return [dir + "/" + file for file in sorted(listdir(dir)) if file.endswith(".css")]
+
+	def get_css(self):
+		files = self.get_css_files()
+
+		if self.site.options.bundle and files:
+			return self.site.bundle_css(files, self.get_css_directory(), self.bundles)
+
+		result = ""
+
+		for file in files:
+			result = result + "<link rel=\"stylesheet\" type=\"text/css\" href=\"" + file + "\">"
+
+		return result
+
+	def get_scripts(self):
+		directory = Site.DIR_POSTS + "/" + self.directory + "/"
+
+		return [directory + file for file in self.REGEX_LOCAL_SCRIPT.findall(resources.read(self.content)) if os.path.isfile(directory + file)]
+
+	def bundle_scripts(self, content):
+		directory = Site.DIR_POSTS + "/" + self.directory + "/"
+
+		def replace_scripts(match):
+			files = self.REGEX_SCRIPT_SOURCE.findall(match.group(0))
+
+			if not all(file.startswith(directory) and os.path.isfile(file) for file in files):
+				return match.group(0)
+
+			script = self.site.bundle_javascript(files, directory + self.DIR_JAVASCRIPT, self.bundles)
+
+			return script + match.group(0)[len(match.group(0).rstrip()):]
+
+		return self.REGEX_SCRIPTS.sub(replace_scripts, content)
+
+	def validate_requirements(self):
+		if not os.path.isfile(self.content):
+			self.site.log("Post " + self.directory + " has no " + self.FILE_CONTENT)
+			self.site.abort()
+
+		if not os.path.isfile(self.properties_file):
+			self.site.log("Post " + self.directory + " has no " + self.FILE_PROPERTIES)
+			self.site.abort()
+
+	def read_properties(self):
+		properties_file = open(self.properties_file)
+		self.properties = json.load(properties_file)
+		properties_file.close()
+
+		profiler.count("bytes_read", os.path.getsize(self.properties_file))
+
+	def get_date(self):
+		parts = self.directory.split("_")
+		year = parts[0]
+		month = self.MONTH_ABBREVIATIONS[int(parts[1]) - 1]
+		day = parts[2]
+
+		return str(day) + " " + month + " " + str(year)
+
+	def get_lastmod(self):
+		parts = self.directory.split("_")
+		year = parts[0]
+		month = parts[1]
+		day = parts[2]
+
+		return str(year) + "-" + str(month.zfill(2)) + "-" + str(day.zfill(2))
+
+	def get_lastmod_atom(self):
+		return self.get_lastmod() + "T08:00:00Z"
+
+	def get_lastmod_rss(self):
+		parts = self.directory.split("_")
+		year = parts[0]
+		month = parts[1]
+		day = parts[2]
+
+		return self.DAY_ABBREVIATIONS[datetime.datetime(int(year), int(month), int(day)).weekday()] + ", " + str(day).rjust(2, '0') + " " + self.MONTH_ABBREVIATIONS[int(month) - 1] + " " + str(year) + " 08:00:00 GMT"
+
+	def get_post_header(self, title, url=None):
+		if url is None:
+			link_open = ""
+			link_close = ""
+		else:
+			link_open = "<a href=\"" + url + "\">"
+			link_close = "</a>"
+
+		return \
+			"<h1>" +\
+			link_open +\
+			title +\
+			link_close +\
+			"</h1><span class=\"date\">" +\
+			self.get_date() +\
+			"</span>"
+
+	def get_title(self):
+		return self.properties[self.PROPERTY_TITLE]
+
+	def get_description(self):
+		return self.properties[self.PROPERTY_ABSTRACT]
+
+	def get_preview(self, lazy):
+		return \
+			"<div class=\"post-link-preview\"><a href=\"" +\
+			self.get_post_file_name() +\
+			"\"><img src=\"" +\
+			self.get_preview_file() +\
+			"\"" +\
+			self.site.get_image_attributes(self.get_preview_file(), lazy) +\
+			" title=\"" +\
+			self.properties[self.PROPERTY_TITLE] +\
+			"\"></a></div>"
+
+	def get_abstract(self):
+		return "<p>" + self.properties[self.PROPERTY_ABSTRACT] + "</p>"
+
+	def get_post_file_name(self):
+		return format_page_name(self.properties[self.PROPERTY_TITLE])
+
+	def get_preview_file(self):
+		return self.site.DIR_POSTS + "/" + self.directory + "/" + self.properties[self.PROPERTY_PREVIEW]
+
+	def build_neighbor(self, neighbor, type):
+		if neighbor is None:
+			return ""
+
+		if type == self.CLASS_POST_REFERENCE_LEFT:
+			title_prefix = "Previously: "
+		else:
+			title_prefix = "Up next: "
+
+		return \
+			"<a href=\"" +\
+			neighbor.get_post_file_name() +\
+			"\" title=\"" +\
+			title_prefix +\
+			neighbor.properties[self.PROPERTY_TITLE] +\
+			"\"><div class=\"" +\
+			self.CLASS_POST_REFERENCE +\
+			" " +\
+			type +\
+			"\">" +\
+			neighbor.properties[self.PROPERTY_TITLE] +\
+			"</div></a>"
+
+	def build_related(self, related):
+		if not related:
+			return ""
+
+		result = "<div id=\"" + self.ID_RELATED + "\"><h2>Related posts</h2>"
+
+		for post in related:
+			result += \
+				"<a href=\"" +\
+				post.get_post_file_name() +\
+				"\"><div class=\"" +\
+				self.CLASS_POST_REFERENCE +\
+				"\">" +\
+				post.properties[self.PROPERTY_TITLE] +\
+				"</div></a>"
+
+		return result + "</div>"
+
+	def build_neighbors(self, previous, next):
+		return \
+			"<div id=\"" +\
+			self.ID_REFERENCES +\
+			"\">" +\
+			self.build_neighbor(previous, self.CLASS_POST_REFERENCE_LEFT) +\
+			self.build_neighbor(next, self.CLASS_POST_REFERENCE_RIGHT) +\
+			"</div>"
+
+	def get_post_link(self):
+		digest = self.site.hash_files([__file__, self.properties_file, self.get_preview_file()])
+		cached = self.site.manifest.get(Manifest.TABLE_LINKS, self.directory)
+
+		if cached is not None and cached[0] == digest:
+			return cached[1]
+
+		link = self.build_post_link()
+
+		self.site.manifest.set(Manifest.TABLE_LINKS, self.directory, [digest, link])
+
+		return link
+
+	def build_post_link(self, lazy=True):
+		return \
+			"<div class=\"" +\
+			self.CLASS_POST_LINK +\
+			"\"><div class=\"text\">" +\
+			self.get_post_header(self.properties[self.PROPERTY_TITLE], self.get_post_file_name()) +\
+			self.get_abstract() +\
+			"</div>" +\
+			self.get_preview(lazy) +\
+			"</div>"
+
+
+class Product:
+	FILE_PROPERTIES = "properties.json"
+	FILE_PREVIEW = "preview.jpg"
+
+	CLASS = "product"
+	CLASS_SUMMARY = "summary"
+
+	KEY_TITLE = "title"
+	KEY_URL = "url"
+	KEY_DESCRIPTION = "description"
+
+	def __init__(self, site, directory, properties=None):
+		self.site = site
+		self.directory = directory
+		self.properties_file = self.get_properties_file(directory)
+		self.properties = properties
+
+		if self.properties is None:
+			self.read_properties()
+
+	@staticmethod
+	def get_properties_file(directory):
+		return directory + "/" + Product.FILE_PROPERTIES
+
+	def read_properties(self):
+		properties_file = open(self.properties_file)
+		self.properties = json.load(properties_file)
+		properties_file.close()
+
+		profiler.count("bytes_read", os.path.getsize(self.properties_file))
+
+	def build_title(self):
+		return "<h2>" + self.properties[self.KEY_TITLE] + "</h2>"
+
+	def build_image(self, lazy):
+		image = "<img src=\"" + self.directory + "/" + self.FILE_PREVIEW + "\"" + self.site.get_image_attributes(self.directory + "/" + self.FILE_PREVIEW, lazy) + ">"
+
+		if self.KEY_URL in self.properties:
+			return "<a href=\"" + self.properties[self.KEY_URL] + "\" target=\"_blank\">" + image + "</a>"
+
+		return image
+
+	def build_description(self):
+		return "<p>" + self.properties[self.KEY_DESCRIPTION] + "</p>"
+
+	def build_content(self, lazy):
+		return "<div class=\"" + self.CLASS_SUMMARY + "\">" + self.build_image(lazy) + self.build_title() + self.build_description() + "</div>"
+
+	def build(self, lazy):
+		self.site.log("Building product \"" + self.properties[self.KEY_TITLE] + "\"")
+
+		return "<div class=\"" + self.CLASS + "\">" + self.build_content(lazy) + "</div>"
+
+
+class Sketch:
+	FILE_PROPERTIES = "properties.json"
+	FILE_PREVIEW = "preview.jpg"
+
+	CLASS = "sketch"
+	CLASS_LINK = "round-button"
+	CLASS_PREVIEW = "preview"
+	CLASS_LINKS = "links"
+	CLASS_SUMMARY = "summary"
+
+	KEY_TITLE = "title"
+	KEY_URL = "url"
+	KEY_SOURCE = "source"
+	KEY_DESCRIPTION = "description"
+
+	TEXT_VIEW = "View"
+	TEXT_SOURCE = "Source"
+
+	def __init__(self, site, directory, properties=None):
+		self.site = site
+		self.directory = directory
+		self.properties_file = self.get_properties_file(directory)
+		self.properties = properties
+
+		if self.properties is None:
+			self.read_properties()
+
+	@staticmethod
+	def get_properties_file(directory):
+		return Site.DIR_SKETCHES + "/" + directory + "/" + Sketch.FILE_PROPERTIES
+
+	def read_properties(self):
+		properties_file = open(self.properties_file)
+		self.properties = json.load(properties_file)
+		properties_file.close()
+
+		profiler.count("bytes_read", os.path.getsize(self.properties_file))
+
+	def get_preview_file(self):
+		return Site.DIR_SKETCHES + "/" + self.directory + "/" + self.FILE_PREVIEW
+
+	def build_image(self, lazy):
+		return "<a href=\"" + self.properties[self.KEY_URL] + "\" target=\"_blank\"><img src=\"" + self.get_preview_file() + "\"" + self.site.get_image_attributes(self.get_preview_file(), lazy) + "></a>"
+
+	def build_title(self):
+		return "<h2>" + self.properties[self.KEY_TITLE] + "</h2>"
+
+	def build_description(self):
+		return "<p>" + self.properties[self.KEY_DESCRIPTION] + "</p>"
+
+	def build_summary(self):
+		return "<div class=\"" + self.CLASS_SUMMARY + "\">" + self.build_title() + self.build_description() + "</div>"
+
+	def build_preview(self, lazy):
+		return "<div class=\"" + self.CLASS_PREVIEW + "\">" + self.build_summary() + self.build_image(lazy) + "</div>"
+
+	def build_link(self, text, target):
+		return "<a href=\"" + target + "\" target=\"_blank\" ><div class=\"" + self.CLASS_LINK + "\">" + text + "</div></a>"
+
+	def build_link_view(self):
+		return self.build_link(self.TEXT_VIEW, self.properties[self.KEY_URL])
+
+	def build_link_source(self):
+		return self.build_link(self.TEXT_SOURCE, self.properties[self.KEY_SOURCE])
+
+	def build_links(self):
+		return "<div class=\"" + self.CLASS_LINKS + "\">" + self.build_link_view() + self.build_link_source() + "</div>"
+
+	def build(self, lazy):
+		self.site.log("Building sketch \"" + self.properties[self.KEY_TITLE] + "\"")
+
+		return "<div class=\"" + self.CLASS + "\">" + self.build_preview(lazy) + self.build_links() + "</div>"
+
+
+class Catalog:
+	FILE = "catalog.json"
+
+	SETTLE_TIME = 2 * 10 ** 9
+
+	def __init__(self, directory):
+		self.file = os.path.join(directory, self.FILE)
+		self.sections = {}
+		self.changed = False
+
+		if os.path.isfile(self.file):
+			catalog_file = open(self.file)
+
+			try:
+				self.sections = json.load(catalog_file)
+			except ValueError:
+				self.sections = {}
+
+			catalog_file.close()
+
+	def get_names(self, directory, list_names):
+		mtime = os.stat(directory).st_mtime_ns
+		section = self.sections.get(directory)
+
+		if section is not None and section["mtime"] == mtime:
+			return section["names"]
+
+		names = list_names()
+		entries = section["entries"] if section is not None else {}
+
+		if time.time_ns() - mtime < self.SETTLE_TIME:
+			mtime = None
+
+		self.sections[directory] = {
+			"mtime": mtime,
+			"names": names,
+			"entries": {name: entries[name] for name in names if name in entries}
+		}
+		self.changed = True
+
+		return names
+
+	def get_cached_properties(self, directory, name):
+		entry = self.sections[directory]["entries"].get(name)
+
+		if entry is None:
+			return None
+
+		return entry[1]
+
+	def get_properties(self, directory, name, file):
+		entry = self.sections[directory]["entries"].get(name)
+
+		if entry is None or not os.path.isfile(file) or os.stat(file).st_mtime_ns != entry[0]:
+			return None
+
+		return entry[1]
+
+	def set_properties(self, directory, name, file, properties):
+		self.sections[directory]["entries"][name] = [os.stat(file).st_mtime_ns, properties]
+		self.changed = True
+
+	def save(self):
+		if not self.changed:
+			return
+
+		os.makedirs(os.path.dirname(self.file), exist_ok=True)
+
+		catalog_file = open(get_temporary_file(self.file), "w")
+		json.dump(self.sections, catalog_file, separators=(",", ":"), sort_keys=True)
+		catalog_file.close()
+
+		replace_file(self.file, get_temporary_file(self.file))
+
+		self.changed = False
+
+
+class CatalogSection:
+	def __init__(self, site, directory, names, type, prefix=""):
+		self.site = site
+		self.directory = directory
+		self.names = names
+		self.type = type
+		self.prefix = prefix
+		self.entries = [None] * len(names)
+
+	def __len__(self):
+		return len(self.names)
+
+	def __iter__(self):
+		for index in range(len(self.names)):
+			yield self[index]
+
+	def __getitem__(self, index):
+		if isinstance(index, slice):
+			return [self[i] for i in range(*index.indices(len(self.names)))]
+
+		if index < 0:
+			index = index + len(self.names)
+
+		if index < 0 or index >= len(self.names):
+			raise IndexError(index)
+
+		if self.entries[index] is None:
+			self.entries[index] = self.create(self.names[index])
+
+		return self.entries[index]
+
+	def create(self, name):
+		file = self.type.get_properties_file(self.prefix + name)
+		properties = self.site.catalog.get_properties(self.directory, name, file)
+		entry = self.type(self.site, self.prefix + name, properties)
+
+		if properties is None:
+			self.site.catalog.set_properties(self.directory, name, file, entry.properties)
+
+		return entry
+
+	def find(self, matches):
+		for index, name in enumerate(self.names):
+			properties = self.site.catalog.get_cached_properties(self.directory, name)
+
+			if properties is not None and matches(properties):
+				return index
+
+		for index, entry in enumerate(self):
+			if matches(entry.properties):
+				return index
+
+		return None
+
+
+class LastmodHistory:
+	FILE = "lastmod.json"
+
+	def __init__(self, file):
+		self.file = file
+		self.entries = {}
+		self.seen = set()
+		self.changed = False
+
+		if os.path.isfile(self.file):
+			history_file = open(self.file)
+
+			try:
+				self.entries = json.load(history_file)
+			except ValueError:
+				self.entries = {}
+
+			history_file.close()
+
+	def get(self, url, digest, default, date):
+		entry = self.entries.get(url)
+
+		self.seen.add(url)
+
+		if entry is not None and entry[0] == digest:
+			return entry[1]
+
+		self.entries[url] = [digest, default if entry is None else date]
+		self.changed = True
+
+		return self.entries[url][1]
+
+	def save(self):
+		for url in [url for url in self.entries if url not in self.seen]:
+			del self.entries[url]
+
+			self.changed = True
+
+		if not self.changed:
+			return
+
+		history_file = open(get_temporary_file(self.file), "w")
+		json.dump(self.entries, history_file, indent="\t", sort_keys=True)
+		history_file.close()
+
+		replace_file(self.file, get_temporary_file(self.file))
+
+		self.changed = False
+
+
+class Manifest:
+	FILE = "manifest.json"
+
+	TABLE_OUTPUTS = "outputs"
+	TABLE_DIGESTS = "digests"
+	TABLE_IMAGES = "images"
+	TABLE_FEATURES = "features"
+	TABLE_LINKS = "links"
+	TABLE_ASSETS = "assets"
+	TABLE_REFERENCES = "references"
+	TABLE_BUNDLES = "bundles"
+	TABLE_TERMS = "terms"
+	TABLE_SIGNATURES = "signatures"
+	TABLE_RELATED = "related"
+	TABLE_HASHES = "hashes"
+
+	TABLES = [
+		TABLE_OUTPUTS,
+		TABLE_DIGESTS,
+		TABLE_IMAGES,
+		TABLE_FEATURES,
+		TABLE_LINKS,
+		TABLE_ASSETS,
+		TABLE_REFERENCES,
+		TABLE_BUNDLES,
+		TABLE_TERMS,
+		TABLE_SIGNATURES,
+		TABLE_RELATED,
+		TABLE_HASHES
+	]
+
+	def __init__(self, directory):
+		self.file = os.path.join(directory, self.FILE)
+		self.tables = {table: {} for table in self.TABLES}
+		self.local = threading.local()
+		self.current = set()
+		self.corrupt = False
+
+		if os.path.isfile(self.file):
+			manifest_file = open(self.file)
+
+			try:
+				manifest = json.load(manifest_file)
+			except ValueError:
+				manifest = None
+
+			manifest_file.close()
+
+			if isinstance(manifest, dict):
+				for table in self.TABLES:
+					self.tables[table] = manifest.get(table, {})
+			else:
+				self.corrupt = True
+
+	def __getstate__(self):
+		state = self.__dict__.copy()
+		del state["local"]
+
+		return state
+
+	def __setstate__(self, state):
+		self.__dict__.update(state)
+		self.local = threading.local()
+
+	def get_touched(self):
+		if not hasattr(self.local, "touched"):
+			self.local.touched = {table: {} for table in self.TABLES}
+
+		return self.local.touched
+
+	def get(self, table, key):
+		return self.tables[table].get(key)
+
+	def set(self, table, key, value):
+		self.tables[table][key] = value
+		self.get_touched()[table][key] = value
+
+	def is_current(self, output, dependencies):
+		current = os.path.isfile(output) and self.get(self.TABLE_OUTPUTS, output) == dependencies
+
+		if current:
+			self.record(output, dependencies)
+
+		return current
+
+	def record(self, output, dependencies):
+		self.current.add(output)
+		self.set(self.TABLE_OUTPUTS, output, dependencies)
+
+	def get_digest(self, output):
+		return self.get(self.TABLE_DIGESTS, output)
+
+	def record_digest(self, output, digest):
+		self.set(self.TABLE_DIGESTS, output, digest)
+
+	def pop_touched(self):
+		touched = self.get_touched()
+		self.local.touched = {table: {} for table in self.TABLES}
+
+		return touched
+
+	def merge(self, touched):
+		for table, entries in touched.items():
+			self.tables[table].update(entries)
+
+		self.current.update(touched[self.TABLE_OUTPUTS])
+
+	def get_stale(self):
+		return [output for output in self.tables[self.TABLE_OUTPUTS] if output not in self.current]
+
+	def remove(self, output):
+		for table in [self.TABLE_OUTPUTS, self.TABLE_DIGESTS]:
+			if output in self.tables[table]:
+				del self.tables[table][output]
+
+	def prune(self, table, keep):
+		entries = {key: value for key, value in self.tables[table].items() if keep(key, value)}
+		pruned = len(self.tables[table]) - len(entries)
+
+		self.tables[table] = entries
+
+		return pruned
+
+	def save(self):
+		os.makedirs(os.path.dirname(self.file), exist_ok=True)
+
+		manifest_file = open(get_temporary_file(self.file), "w")
+		json.dump(self.tables, manifest_file, indent="\t", sort_keys=True)
+		manifest_file.close()
+
+		replace_file(self.file, get_temporary_file(self.file))
+
+
+class Site:
+	URL = "https://jobtalle.com/"
+
+	LOCALE = "en_US"
+
+	TITLE = "Job Talle"
+	TITLE_DIVISOR = " | "
+
+	DESCRIPTION = "A blog about software development, AI & Algorithms"
+
+	DIR_POSTS = "posts"
+	DIR_SKETCHES = "sketches"
+	DIR_GAMES = "games"
+	DIR_WORK = "work"
+	DIR_JAVASCRIPT = "js"
+	DIR_TEMPLATES = "templates"
+	DIR_IMAGES = "img"
+	DIR_CSS = "css"
+	DIR_CACHE = ".build"
+	DIR_ASSETS = "assets"
+
+	FILE_TEMPLATE = "template.html"
+	FILE_LOADMORE = "loadmore.html"
+	FILE_SERVICE_WORKER = "sw.js"
+	FILE_SEARCH_SCRIPT = "js/search.js"
+	FILE_ASSETS = "manifest.json"
+	FILE_STYLESHEET = "style.css"
+
+	KEY_TITLE = "$title$"
+	KEY_ADDITIONAL_CSS = "$additional-css$"
 	KEY_MENU_BUTTONS = "$menu-buttons$"
 	KEY_CONTENT = "$content$"
 	KEY_POST_SCRIPT = "$post-script$"
@@ -439,10 +2266,59 @@ class Site:
 	KEY_META = "$additional-meta$"
 	KEY_YEAR = "$year$"
 	KEY_ICON = "$icon"
+	KEY_STYLESHEET = "$stylesheet$"
 
 	INDEX_LINKS_PER_PAGE = 100
 
+	WRITE_BUFFER_SIZE = 1 << 16
+
+	SIDECAR_EXTENSIONS = [".gz", ".zst"]
+
+	EAGER_PREVIEWS = 2
+
+	ASSET_EXTENSIONS = [".css", ".js", ".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp"]
+	ASSET_COMPRESSED_EXTENSIONS = [".css", ".js", ".svg"]
+	ASSET_HASH_LENGTH = 16
+
+	BUNDLE_INLINE_LIMIT = 2048
+
+	CRITICAL_CSS_BUDGET = 8192
+
+	FEED_RSS = "rss"
+	FEED_ATOM = "atom"
+	FEED_JSON = "json"
+	FEEDS = [FEED_RSS, FEED_ATOM, FEED_JSON]
+	FEED_FILES = {
+		FEED_RSS: "rss.xml",
+		FEED_ATOM: "atom.xml",
+		FEED_JSON: "feed.json"
+	}
+	FEED_ITEMS = 20
+	FEED_HISTORY = "http://purl.org/syndication/history/1.0"
+
+	SITEMAP_URLS = 50000
+	SITEMAP_BYTES = 50 * 1024 * 1024
+	SITEMAP_HEADER = "<?xml version=\"1.0\" encoding=\"UTF-8\"?><urlset xmlns=\"http://www.sitemaps.org/schemas/sitemap/0.9\">"
+	SITEMAP_FOOTER = "</urlset>"
+	HINTS_BUDGET = 1024
+
+	REGEX_CSS_URL = re.compile("url\\(\\s*([\"']?)([^\"')]+)\\1\\s*\\)")
+
+	REGEX_IMAGE = re.compile("<img\\b([^>]*?)(/?)>", re.IGNORECASE)
+	REGEX_IMAGE_SOURCE = re.compile("\\ssrc=\"([^\"]*)\"")
+	REGEX_LASTMOD = re.compile("<lastmod>([^<]*)</lastmod>")
+	REGEX_OUTPUT = re.compile(".*\\.html|(?:rss|atom)(?:-[0-9]+)?\\.xml|feed(?:-[0-9]+)?\\.json|sitemap[0-9]*\\.xml")
+
 	SCRIPT_LOAD_MORE = "<script src=\"js/loadmore.js\"></script>"
+	SCRIPT_SEARCH = "<script src=\"" + FILE_SEARCH_SCRIPT + "\"></script><script>searchAttach(document.getElementById(\"search-input\"), document.getElementById(\"search-results\"));</script>"
+	SEARCH_FORM = "<div id=\"search\"><input type=\"search\" id=\"search-input\" placeholder=\"Search posts\" aria-label=\"Search posts\"><ul id=\"search-results\"></ul></div>"
+	SCRIPT_SERVICE_WORKER = "<script>if (\"serviceWorker\" in navigator) navigator.serviceWorker.register(\"" + FILE_SERVICE_WORKER + "\");</script>"
+
+	PRECACHE_FILES = [
+		"css/style.css",
+		"js/loadmore.js",
+		"img/favicon.gif"
+	]
 
 	MENU_PAGES = [
 		"index.html",
@@ -461,44 +2337,688 @@ class Site:
 		"Contact"
 	]
 
-	def __init__(self, exclusive=None):
+	def __init__(self, exclusive=None, options=None):
 		self.validate_requirements()
 
-		self.log_scope = 0
+		self.options = options if options is not None else parse_arguments([])
+		self.timestamp = self.get_timestamp()
+		self.critical_css = None
+		self.related = None
+
+		self.local = threading.local()
 		self.log("Analyzing sources")
 
 		self.exclusive = exclusive
 		if self.exclusive is not None:
 			self.log("Only building " + exclusive)
 
-		self.template = inline_icons(self.read_template())
-		self.posts = self.get_posts()
-		self.sketches = self.get_sketches()
-		self.games = self.get_games()
-		self.work = self.get_work()
+		self.manifest = Manifest(self.DIR_CACHE)
+		if self.manifest.corrupt:
+			self.log("Ignoring corrupt " + self.manifest.file + ", rebuilding everything")
+
+		self.catalog = Catalog(self.DIR_CACHE)
+		self.lastmod = LastmodHistory(LastmodHistory.FILE)
+		self.template = Template(os.path.join(self.DIR_TEMPLATES, self.FILE_TEMPLATE), self.options.icons)
+
+		with profiler.phase("get_posts"):
+			self.posts = self.get_posts()
+
+		with profiler.phase("get_products"):
+			self.sketches = self.get_sketches()
+			self.games = self.get_games()
+			self.work = self.get_work()
+
+	def __getstate__(self):
+		state = self.__dict__.copy()
+		del state["local"]
+
+		return state
+
+	def __setstate__(self, state):
+		self.__dict__.update(state)
+		self.local = threading.local()
+
+	@staticmethod
+	def get_output(file):
+		if file.endswith(get_temporary_file("")):
+			file = file[:-len(get_temporary_file(""))]
+
+		for extension in Site.SIDECAR_EXTENSIONS:
+			if file.endswith(extension) and Site.REGEX_OUTPUT.fullmatch(file[:-len(extension)]):
+				file = file[:-len(extension)]
+
+		if Site.REGEX_OUTPUT.fullmatch(file):
+			return file
+
+		return None
 
 	@staticmethod
 	def clean():
 		for file in listdir("."):
-			if file.endswith(".html"):
+			if Site.get_output(file) is not None:
+				os.remove(file)
+
+		for cache in [Manifest.FILE, Catalog.FILE]:
+			if os.path.isfile(os.path.join(Site.DIR_CACHE, cache)):
+				os.remove(os.path.join(Site.DIR_CACHE, cache))
+
+		for directory in [Site.DIR_ASSETS, SearchIndex.DIR]:
+			if os.path.isdir(directory):
+				shutil.rmtree(directory)
+
+		for output in [Template.FILE_SPRITE, Site.FILE_SERVICE_WORKER]:
+			for file in [output] + [output + extension for extension in Site.SIDECAR_EXTENSIONS]:
+				if os.path.isfile(file):
+					os.remove(file)
+
+	def get_timestamp(self):
+		if self.options.timestamp is not None:
+			timestamp = self.options.timestamp
+		elif os.environ.get("SOURCE_DATE_EPOCH"):
+			timestamp = int(os.environ["SOURCE_DATE_EPOCH"])
+		else:
+			timestamp = time.time()
+
+		return datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc)
+
+	def get_year(self):
+		return str(self.timestamp.year)
+
+	def hash_file(self, file):
+		stat = self.get_stat(file)
+		recorded = self.manifest.get(Manifest.TABLE_HASHES, file)
+
+		if stat is not None and recorded is not None and recorded[:2] == stat:
+			return recorded[2]
+
+		digest = resources.hash(file)
+
+		self.manifest.set(Manifest.TABLE_HASHES, file, stat + [digest])
+
+		return digest
+
+	def hash_files(self, files):
+		return hash_string("".join(file + self.hash_file(file) for file in files))
+
+	def get_template_dependencies(self):
+		dependencies = {
+			__file__: self.hash_file(__file__),
+			"$year$": self.get_year(),
+			"$fingerprint$": str(self.options.fingerprint),
+			"$bundle$": str(self.options.bundle),
+			"$critical-css$": str(self.options.critical_css),
+			"$icons$": self.options.icons,
+			"$hints$": str(self.options.hints),
+			"$service-worker$": str(self.options.service_worker)
+		}
+
+		if self.options.critical_css:
+			dependencies[self.get_stylesheet_file()] = self.hash_file(self.get_stylesheet_file())
+
+		for file in [self.template.file] + self.template.icons:
+			dependencies[file] = self.hash_file(file)
+
+		return dependencies
+
+	def is_current(self, output, dependencies):
+		if self.manifest.is_current(output, dependencies) and self.is_output_unchanged(output) and self.is_references_current(output) and self.is_bundles_current(output):
+			self.update_sidecars(output)
+
+			return True
+
+		return False
+
+	def record(self, output, dependencies):
+		self.manifest.record(output, dependencies)
+
+	def is_output_unchanged(self, output):
+		recorded = self.manifest.get_digest(output)
+
+		if recorded is None:
+			return True
+
+		if len(recorded) == 3 and recorded[2].get(output) == self.get_stat(output):
+			return True
+
+		source_file = open(output, "rb")
+		data = source_file.read()
+		source_file.close()
+
+		profiler.count("bytes_read", len(data))
+
+		if hashlib.sha1(data).hexdigest() == recorded[0]:
+			return True
+
+		self.log("Rebuilding " + output + ", it was changed after the last build")
+
+		return False
+
+	def remove_stale(self):
+		for output in self.manifest.get_stale():
+			self.log("Removing stale output " + output)
+
+			for file in [output] + [output + extension for extension in self.SIDECAR_EXTENSIONS]:
+				if os.path.isfile(file):
+					os.remove(file)
+
+			self.manifest.remove(output)
+
+		for directory in [self.DIR_ASSETS, SearchIndex.DIR]:
+			if os.path.isdir(directory) and not listdir(directory):
+				os.rmdir(directory)
+
+		for file in listdir("."):
+			output = self.get_output(file)
+
+			if output is not None and (output not in self.manifest.current or file.endswith(get_temporary_file(""))):
+				self.log("Removing unknown output " + file)
+
 				os.remove(file)
 
-	def build(self):
-		self.log("Starting build")
-		self.log_scope_increment()
+	def prune_manifest(self):
+		directories = set(self.posts.names)
+		pruned = 0
+
+		for table in [Manifest.TABLE_FEATURES, Manifest.TABLE_LINKS, Manifest.TABLE_TERMS, Manifest.TABLE_SIGNATURES]:
+			pruned = pruned + self.manifest.prune(table, lambda directory, entry: directory in directories)
+
+		for table in [Manifest.TABLE_REFERENCES, Manifest.TABLE_BUNDLES]:
+			pruned = pruned + self.manifest.prune(table, lambda output, entry: output in self.manifest.current)
+
+		pruned = pruned + self.manifest.prune(Manifest.TABLE_ASSETS, lambda source, entry: entry[1] in self.manifest.current)
+		pruned = pruned + self.manifest.prune(Manifest.TABLE_HASHES, lambda file, entry: os.path.isfile(file))
+
+		digests = set(entry[2] for entry in self.manifest.tables[Manifest.TABLE_HASHES].values())
+
+		pruned = pruned + self.manifest.prune(Manifest.TABLE_IMAGES, lambda digest, entry: digest in digests)
+
+		if not self.options.related:
+			pruned = pruned + self.manifest.prune(Manifest.TABLE_RELATED, lambda key, entry: False)
+
+		if pruned:
+			self.log("Pruned " + str(pruned) + " unused manifest entries")
+
+	def build(self):
+		self.log("Starting build")
+		self.log_scope_increment()
+
+		with profiler.phase("build_posts"):
+			self.build_posts()
+
+		with profiler.phase("build_feeds"):
+			self.build_feeds()
+
+		with profiler.phase("build_indices"):
+			self.build_indices()
+
+		if self.template.mode == Template.ICONS_SPRITE:
+			with profiler.phase("build_sprite"):
+				self.build_sprite()
+
+		if self.options.search:
+			with profiler.phase("build_search"):
+				self.build_search()
+
+		if self.exclusive is None:
+			for index in range(1, len(self.MENU_PAGES)):
+				with profiler.phase("build_page " + self.MENU_PAGES[index]):
+					self.build_page(self.MENU_PAGES[index], self.MENU_TITLES[index])
+
+		with profiler.phase("build_sitemap"):
+			self.build_sitemap()
+
+		if self.exclusive is None:
+			if self.options.service_worker:
+				with profiler.phase("build_service_worker"):
+					self.build_service_worker()
+
+			if self.options.fingerprint:
+				with profiler.phase("build_assets"):
+					self.build_asset_manifest()
+
+			self.remove_stale()
+			self.prune_manifest()
+
+		self.manifest.save()
+		self.catalog.save()
+
+		self.log_scope_decrement()
+		self.log("Done")
+
+	def is_references_current(self, output):
+		if not self.options.fingerprint:
+			return True
+
+		references = self.manifest.get(Manifest.TABLE_REFERENCES, output)
+
+		if references is None:
+			return True
+
+		return all(self.get_asset(source) == asset for source, asset in references.items())
+
+	def is_bundles_current(self, output):
+		bundles = self.manifest.get(Manifest.TABLE_BUNDLES, output)
+
+		if bundles is None:
+			return True
+
+		for source, asset in bundles.items():
+			if source == asset:
+				if not os.path.isfile(asset):
+					return False
+
+				self.record_asset(asset)
+			elif self.get_asset(source) != asset:
+				return False
+
+		return True
+
+	def get_asset_source(self, reference):
+		if "://" in reference or reference.startswith(("/", "data:", "mailto:")) or "?" in reference or "#" in reference:
+			return None
+
+		source = os.path.normpath(reference).replace(os.sep, "/")
+
+		if source.startswith(self.DIR_ASSETS + "/") or os.path.splitext(source)[1].lower() not in self.ASSET_EXTENSIONS or source.startswith("..") or not os.path.isfile(source):
+			return None
+
+		return source
+
+	def read_asset(self, source):
+		if os.path.splitext(source)[1].lower() != ".css":
+			asset_file = open(source, "rb")
+			data = asset_file.read()
+			asset_file.close()
+
+			return data
+
+		return self.rebase_css(resources.read(source), os.path.dirname(source), self.DIR_ASSETS).encode("utf-8")
+
+	def rebase_css(self, css, directory, target, assets=None):
+		def replace_url(match):
+			reference = match.group(2).strip()
+
+			if "://" in reference or reference.startswith(("/", "data:", "#")):
+				return match.group(0)
+
+			file = os.path.join(directory, reference)
+
+			if self.options.fingerprint:
+				asset = self.get_asset(file)
+
+				if asset is not None:
+					if assets is not None:
+						assets[file] = asset
+
+					file = asset
+
+			return "url(\"" + os.path.relpath(file, target).replace(os.sep, "/") + "\")"
+
+		return self.REGEX_CSS_URL.sub(replace_url, css)
+
+	def get_asset(self, reference):
+		source = self.get_asset_source(reference)
+
+		if source is None:
+			return None
+
+		digest = self.hash_file(source)
+		cached = self.manifest.get(Manifest.TABLE_ASSETS, source)
+
+		if cached is not None and cached[0] == digest and os.path.splitext(source)[1].lower() != ".css" and os.path.isfile(cached[1]):
+			asset = cached[1]
+
+			self.record_asset(asset)
+		else:
+			asset = self.write_asset(self.read_asset(source), os.path.splitext(source)[1].lower(), source)
+
+			self.manifest.set(Manifest.TABLE_ASSETS, source, [digest, asset])
+
+		return asset
+
+	def write_asset(self, data, extension, source):
+		asset = self.DIR_ASSETS + "/" + hashlib.sha1(data).hexdigest()[:self.ASSET_HASH_LENGTH] + extension
+
+		if not os.path.isfile(asset):
+			os.makedirs(self.DIR_ASSETS, exist_ok=True)
+
+			temporary = get_temporary_file(asset + "." + str(os.getpid()) + "." + str(threading.get_ident()))
+			asset_file = open(temporary, "wb")
+			asset_file.write(data)
+			asset_file.close()
+
+			replace_file(asset, temporary)
+
+			profiler.count("bytes_written", len(data))
+
+			self.log("Fingerprinted " + source + " as " + asset)
+
+		self.record_asset(asset)
+
+		return asset
+
+	def record_asset(self, asset):
+		if asset not in self.manifest.current:
+			self.record(asset, {"$asset$": asset})
+
+			if os.path.splitext(asset)[1] in self.ASSET_COMPRESSED_EXTENSIONS:
+				self.update_sidecars(asset)
+
+	def bundle_css(self, files, source, assets):
+		css = Minifier.minify_css("\n".join(self.rebase_css(resources.read(file), os.path.dirname(file), ".", assets) for file in files))
+
+		if len(css) <= self.BUNDLE_INLINE_LIMIT:
+			self.log("Inlined " + str(len(files)) + " stylesheets from " + source + " in " + str(len(css)) + " bytes")
+
+			return "<style>" + css + "</style>"
+
+		css = Minifier.minify_css("\n".join(self.rebase_css(resources.read(file), os.path.dirname(file), self.DIR_ASSETS) for file in files))
+		asset = self.write_asset(css.encode("utf-8"), ".css", source)
+		assets[asset] = asset
+
+		self.log("Bundled " + str(len(files)) + " stylesheets from " + source + " into " + asset)
+
+		return "<link rel=\"stylesheet\" type=\"text/css\" href=\"" + asset + "\">"
+
+	def bundle_javascript(self, files, source, assets):
+		javascript = "\n;\n".join(resources.read(file).strip() for file in files)
+
+		if len(javascript) <= self.BUNDLE_INLINE_LIMIT and "</script" not in javascript.lower():
+			self.log("Inlined " + str(len(files)) + " scripts from " + source + " in " + str(len(javascript)) + " bytes")
+
+			return "<script>" + javascript + "</script>"
+
+		asset = self.write_asset(javascript.encode("utf-8"), ".js", source)
+		assets[asset] = asset
+
+		self.log("Bundled " + str(len(files)) + " scripts from " + source + " into " + asset)
+
+		return "<script src=\"" + asset + "\"></script>"
+
+	def build_asset_manifest(self):
+		assets = {source: entry[1] for source, entry in self.manifest.tables[Manifest.TABLE_ASSETS].items() if entry[1] in self.manifest.current}
+		file = self.DIR_ASSETS + "/" + self.FILE_ASSETS
+		dependencies = {"$assets$": hash_string(json.dumps(assets, sort_keys=True))}
+
+		if self.is_current(file, dependencies):
+			self.log("Skipping " + file + ", it is up to date")
+
+			return
+
+		self.log("Building " + file + " for " + str(len(assets)) + " assets")
+
+		os.makedirs(self.DIR_ASSETS, exist_ok=True)
+
+		manifest_file = open(get_temporary_file(file), "w")
+		json.dump(assets, manifest_file, indent="\t", sort_keys=True)
+		manifest_file.close()
+
+		self.replace(file)
+		self.record(file, dependencies)
+		self.update_sidecars(file)
+
+	def get_precache(self):
+		precache = {}
+		files = list(self.PRECACHE_FILES)
+
+		if self.options.search:
+			files.append(self.FILE_SEARCH_SCRIPT)
+
+		for file in files:
+			if self.options.fingerprint:
+				precache[self.get_asset(file) or file] = self.hash_file(file)[:self.ASSET_HASH_LENGTH]
+			else:
+				precache[file] = self.hash_file(file)[:self.ASSET_HASH_LENGTH]
+
+		for output in self.manifest.current:
+			digest = self.manifest.get_digest(output)
+
+			if digest is not None and (output.endswith(".html") and "/" not in output or output == Template.FILE_SPRITE):
+				precache[output] = digest[0][:self.ASSET_HASH_LENGTH]
+
+		return precache
+
+	def build_service_worker(self):
+		source = os.path.join(self.DIR_TEMPLATES, self.FILE_SERVICE_WORKER)
+		precache = self.get_precache()
+		dependencies = {
+			source: self.hash_file(source),
+			"$precache$": hash_string(json.dumps(precache, sort_keys=True))
+		}
+
+		if self.is_current(self.FILE_SERVICE_WORKER, dependencies):
+			self.log("Skipping " + self.FILE_SERVICE_WORKER + ", it is up to date")
+
+			return
+
+		self.log("Building " + self.FILE_SERVICE_WORKER + " precaching " + str(len(precache)) + " files")
+
+		script = resources.read(source).replace("$assets$", json.dumps(self.DIR_ASSETS + "/"))
+		script = script.replace("$precache$", json.dumps(precache, separators=(",", ":"), sort_keys=True))
+
+		self.write(self.FILE_SERVICE_WORKER, [script], False)
+
+		self.record(self.FILE_SERVICE_WORKER, dependencies)
+
+	def get_image_size(self, file):
+		if not os.path.isfile(file):
+			return None
+
+		digest = self.hash_file(file)
+		size = self.manifest.get(Manifest.TABLE_IMAGES, digest)
+
+		if size is None:
+			size = read_image_size(file)
+
+			if size is None:
+				self.log("Could not read the dimensions of " + file)
+
+				return None
+
+			size = list(size)
+
+			self.manifest.set(Manifest.TABLE_IMAGES, digest, size)
+
+		return size
+
+	def get_image_attributes(self, file, lazy, attributes=""):
+		result = ""
+		size = self.get_image_size(file)
+
+		if size is not None and " width=" not in attributes and " height=" not in attributes:
+			result += " width=\"" + str(size[0]) + "\" height=\"" + str(size[1]) + "\""
+
+		if lazy and " loading=" not in attributes:
+			result += " loading=\"lazy\" decoding=\"async\""
+
+		return result
+
+	def add_image_attributes(self, html, eager):
+		count = 0
+
+		def replace_image(match):
+			nonlocal count
+
+			attributes = match.group(1)
+			source = self.REGEX_IMAGE_SOURCE.search(attributes)
+			lazy = count >= eager
+			count = count + 1
+
+			if source is None or "://" in source.group(1) or source.group(1).startswith("data:"):
+				return match.group(0)
+
+			return "<img" + attributes + self.get_image_attributes(source.group(1), lazy, attributes) + match.group(2) + ">"
+
+		return self.REGEX_IMAGE.sub(replace_image, html)
+
+	def get_local_images(self, html):
+		images = []
+
+		for match in self.REGEX_IMAGE.finditer(html):
+			source = self.REGEX_IMAGE_SOURCE.search(match.group(1))
+
+			if source is not None and "://" not in source.group(1) and not source.group(1).startswith("data:"):
+				images.append(source.group(1))
+
+		return images
+
+	def get_eager_images(self, html, eager):
+		return self.get_local_images(html)[:eager]
+
+	def get_hints(self, file, images, pages):
+		if not self.options.hints:
+			return ""
+
+		hints = ["<link rel=\"preload\" as=\"image\" href=\"" + image + "\"/>" for image in images]
+		hints += ["<link rel=\"prefetch\" href=\"" + page + "\"/>" for page in pages]
+		rules = {}
+		menu = [page for page in self.MENU_PAGES if page != file and page not in pages]
+
+		if pages:
+			rules["prerender"] = [{"source": "list", "urls": pages, "eagerness": "moderate"}]
+
+		if menu:
+			rules["prefetch"] = [{"source": "list", "urls": menu, "eagerness": "moderate"}]
+
+		if rules:
+			hints.append("<script type=\"speculationrules\">" + json.dumps(rules, separators=(",", ":")) + "</script>")
+
+		result = ""
+
+		for hint in hints:
+			if len(result) + len(hint) > self.HINTS_BUDGET:
+				self.log("Dropped " + str(len(hints) - hints.index(hint)) + " loading hints, they exceed " + str(self.HINTS_BUDGET) + " bytes")
+
+				break
+
+			result += hint
+
+		return result
+
+	def write_search_file(self, file, data):
+		dependencies = {"$content$": hash_string(data)}
+
+		if self.is_current(file, dependencies):
+			return
+
+		os.makedirs(SearchIndex.DIR, exist_ok=True)
+
+		self.write(file, [data], False)
+		self.record(file, dependencies)
+
+	def build_search(self):
+		posts = list(reversed(self.posts))
+		shards = SearchIndex.build_shards([post.get_search_terms() for post in posts])
+		files = {}
+
+		self.log("Building search index for " + str(len(posts)) + " posts in " + str(len(shards)) + " shards")
+		self.log_scope_increment()
+
+		for prefix, shard in sorted(shards.items()):
+			data = json.dumps(shard, separators=(",", ":"), sort_keys=True)
+			files[prefix] = prefix + "." + hash_string(data)[:SearchIndex.HASH_LENGTH] + ".json"
+
+			self.write_search_file(SearchIndex.DIR + "/" + files[prefix], data)
+
+		self.write_search_file(SearchIndex.DIR + "/" + SearchIndex.FILE_INDEX, json.dumps({
+			"prefix": SearchIndex.PREFIX_LENGTH,
+			"lengths": [SearchIndex.TERM_LENGTH_MIN, SearchIndex.TERM_LENGTH_MAX, SearchIndex.STEM_LENGTH_MIN],
+			"suffixes": SearchIndex.SUFFIXES,
+			"stopwords": SearchIndex.STOPWORDS,
+			"shards": files,
+			"documents": [[post.get_post_file_name(), post.properties[Post.PROPERTY_TITLE]] for post in posts]
+		}, separators=(",", ":"), sort_keys=True))
+
+		self.log_scope_decrement()
+
+	def build_sprite(self):
+		dependencies = {
+			__file__: self.hash_file(__file__),
+			self.DIR_IMAGES: self.hash_files(sorted(set(self.template.icons)))
+		}
+
+		if self.is_current(Template.FILE_SPRITE, dependencies):
+			self.log("Skipping " + Template.FILE_SPRITE + ", it is up to date")
+
+			return
+
+		self.log("Building " + Template.FILE_SPRITE + " with " + str(len(set(self.template.icons))) + " icons")
+
+		self.write(Template.FILE_SPRITE, [self.template.get_sprite()], False)
+
+		self.record(Template.FILE_SPRITE, dependencies)
+
+	def get_stylesheet_file(self):
+		return self.DIR_CSS + "/" + self.FILE_STYLESHEET
+
+	def get_stylesheet(self):
+		return "<link rel=\"stylesheet\" type=\"text/css\" href=\"" + self.get_stylesheet_file() + "\"/>"
+
+	def get_stylesheet_async(self):
+		return \
+			"<link rel=\"preload\" as=\"style\" href=\"" +\
+			self.get_stylesheet_file() +\
+			"\" onload=\"this.onload=null;this.rel='stylesheet'\"/><noscript>" +\
+			self.get_stylesheet() +\
+			"</noscript>"
+
+	def get_critical_css(self, file, page):
+		with profiler.phase("critical_css"):
+			if self.critical_css is None:
+				self.critical_css = CriticalCSS(self.get_stylesheet_file())
+
+			css = self.rebase_css(self.critical_css.extract(page), self.DIR_CSS, ".")
+
+		profiler.count("size_critical_css", len(css))
+
+		self.log("Critical CSS for " + file + " is " + str(len(css)) + " bytes")
+
+		if len(css) > self.CRITICAL_CSS_BUDGET:
+			self.log("Critical CSS for " + file + " exceeds the budget of " + str(self.CRITICAL_CSS_BUDGET) + " bytes")
+
+		return "<style>" + css + "</style>"
+
+	def set_critical_css(self, file, values):
+		critical_css = self.get_critical_css(file, self.template.render(values))
+
+		values[self.KEY_STYLESHEET] = self.get_stylesheet_async()
+		values[self.KEY_ADDITIONAL_CSS] = critical_css + values[self.KEY_ADDITIONAL_CSS]
+
+	def log_icons(self, file):
+		if self.template.mode == Template.ICONS_INLINE:
+			return
+
+		profiler.count("size_icons_saved", self.template.icon_bytes_saved)
+
+		self.log("Icons in " + file + " saved " + str(self.template.icon_bytes_saved) + " bytes")
+
+	def render_page(self, file, values):
+		values[self.KEY_STYLESHEET] = self.get_stylesheet()
+
+		if self.options.service_worker:
+			values[self.KEY_POST_SCRIPT] += self.SCRIPT_SERVICE_WORKER
+
+		self.log_icons(file)
+
+		if self.options.critical_css:
+			self.set_critical_css(file, values)
+
+		return self.template.render(values)
+
+	def stream_page(self, file, values):
+		values[self.KEY_STYLESHEET] = self.get_stylesheet()
+
+		if self.options.service_worker:
+			values[self.KEY_POST_SCRIPT] += self.SCRIPT_SERVICE_WORKER
 
-		self.build_posts()
-		self.build_sitemap()
-		self.build_rss()
+		self.log_icons(file)
 
-		if self.exclusive is None:
-			self.build_indices()
+		if self.options.critical_css:
+			values[self.KEY_CONTENT] = "".join(values[self.KEY_CONTENT])
 
-			for index in range(1, len(self.MENU_PAGES)):
-				self.build_page(self.MENU_PAGES[index], self.MENU_TITLES[index])
+			self.set_critical_css(file, values)
 
-		self.log_scope_decrement()
-		self.log("Done")
+		return self.template.stream(values)
 
 	def build_menu(self, current = None):
 		result = ""
@@ -517,10 +3037,34 @@ class Site:
 
 		return result
 
+	def get_page_dependencies(self, page):
+		dependencies = self.get_template_dependencies()
+		dependencies[os.path.join(self.DIR_TEMPLATES, page)] = self.hash_file(os.path.join(self.DIR_TEMPLATES, page))
+
+		for image in self.get_local_images(resources.read(os.path.join(self.DIR_TEMPLATES, page))):
+			if os.path.isfile(image):
+				dependencies[image] = self.hash_file(image)
+
+		if page == "sketches.html":
+			dependencies[self.DIR_SKETCHES] = self.hash_files([file for sketch in self.sketches for file in [sketch.properties_file, sketch.get_preview_file()]])
+		elif page == "games.html":
+			dependencies[self.DIR_GAMES] = self.hash_files([file for game in self.games for file in [game.properties_file, game.directory + "/" + game.FILE_PREVIEW]])
+		elif page == "work.html":
+			dependencies[self.DIR_WORK] = self.hash_files([file for work in self.work for file in [work.properties_file, work.directory + "/" + work.FILE_PREVIEW]])
+
+		return dependencies
+
 	def build_page(self, page, title):
-		source_file = open(os.path.join(self.DIR_TEMPLATES, page))
-		source = source_file.read()
-		source_file.close()
+		dependencies = self.get_page_dependencies(page)
+
+		if self.is_current(page, dependencies):
+			self.log("Skipping " + page + ", it is up to date")
+
+			return
+
+		self.log("Building " + page)
+
+		source = resources.read(os.path.join(self.DIR_TEMPLATES, page))
 
 		if page == "sketches.html":
 			source = source.replace("$sketches$", self.build_sketches())
@@ -529,122 +3073,454 @@ class Site:
 		elif page == "work.html":
 			source = source.replace("$work$", self.build_work())
 
-		result = replace_keys({
+		source = self.add_image_attributes(source, self.EAGER_PREVIEWS)
+
+		result = self.render_page(page, {
 			self.KEY_TITLE: self.TITLE + self.TITLE_DIVISOR + title,
 			self.KEY_DESCRIPTION: self.DESCRIPTION,
 			self.KEY_ADDITIONAL_CSS: "",
 			self.KEY_MENU_BUTTONS: self.build_menu(page),
 			self.KEY_CONTENT: source,
 			self.KEY_POST_SCRIPT: "",
-			self.KEY_YEAR: str(datetime.datetime.now().year),
-			self.KEY_META: ""
-		}, self.template)
+			self.KEY_YEAR: self.get_year(),
+			self.KEY_META: self.get_hints(page, self.get_eager_images(source, self.EAGER_PREVIEWS), [])
+		})
+
+		self.write(page, [result])
+
+		self.record(page, dependencies)
+
+	def get_jobs(self):
+		if self.options.jobs < 1:
+			return os.cpu_count() or 1
+
+		return self.options.jobs
+
+	def build_post(self, index):
+		if index == 0:
+			next = None
+		else:
+			next = self.posts[index - 1]
+
+		if index == len(self.posts) - 1:
+			previous = None
+		else:
+			previous = self.posts[index + 1]
+
+		if self.related is None:
+			related = []
+		else:
+			related = [self.posts[other] for other in self.related[index]]
+
+		with profiler.phase("Post.build " + self.posts[index].directory):
+			self.posts[index].build(previous, next, related)
+
+	def build_posts_parallel(self, indices):
+		jobs = min(self.get_jobs(), len(indices))
+
+		try:
+			executor = concurrent.futures.ProcessPoolExecutor(jobs, initializer=initialize_worker, initargs=(self, self.get_log_scope()))
+		except (ImportError, NotImplementedError, PermissionError):
+			self.log("Process pool unavailable, rendering posts on " + str(jobs) + " threads")
+
+			executor = concurrent.futures.ThreadPoolExecutor(jobs, initializer=initialize_worker, initargs=(self, self.get_log_scope()))
+
+		with executor:
+			results = list(executor.map(build_post, indices))
+
+		for touched, records in results:
+			self.manifest.merge(touched)
+			profiler.attach(records)
+
+	def find_related(self):
+		digest = hash_string(str(self.options.related) + "".join(post.directory + post.get_search_digest() for post in self.posts))
+		cached = self.manifest.get(Manifest.TABLE_RELATED, "posts")
+
+		if cached is not None and cached[0] == digest:
+			self.log("Reusing related posts, no post changed")
+
+			return cached[1]
+
+		vectors = RelatedPosts.get_vectors([post.get_search_terms() for post in self.posts])
+
+		if len(self.posts) > RelatedPosts.EXACT_LIMIT:
+			self.log("Finding related posts for " + str(len(self.posts)) + " posts using MinHash signatures")
+
+			related = RelatedPosts.find_approximate(vectors, [post.get_signature() for post in self.posts], self.options.related)
+		else:
+			self.log("Finding related posts for " + str(len(self.posts)) + " posts" + (" using NumPy" if numpy is not None else ""))
+
+			related = RelatedPosts.find_exact(vectors, self.options.related)
+
+		self.manifest.set(Manifest.TABLE_RELATED, "posts", [digest, related])
 
-		file = open(page, "w")
-		file.write(compress(result))
-		file.close()
+		return related
 
 	def build_posts(self):
-		self.post_links = []
+		if self.options.related:
+			with profiler.phase("find_related"):
+				self.related = self.find_related()
 
-		for index in range(0, len(self.posts)):
-			if index == 0:
-				next = None
-			else:
-				next = self.posts[index - 1]
+		if self.exclusive is None:
+			indices = list(range(0, len(self.posts)))
+		else:
+			index = self.posts.find(lambda properties: format_page_name(properties[Post.PROPERTY_TITLE]) == self.exclusive)
+			indices = [] if index is None else [index]
 
-			if index == len(self.posts) - 1:
-				previous = None
-			else:
-				previous = self.posts[index + 1]
+		if self.get_jobs() > 1 and len(indices) > 1:
+			self.log("Rendering " + str(len(indices)) + " posts on " + str(min(self.get_jobs(), len(indices))) + " workers")
 
-			post = self.posts[index]
-			if self.exclusive is None or post.get_post_file_name() == self.exclusive:
-				self.post_links.append(post.build(previous, next))
+			self.build_posts_parallel(indices)
+		else:
+			for index in indices:
+				self.build_post(index)
 
 	def build_sketches(self):
 		result = ""
 
-		for sketch in self.sketches:
-			result += sketch.build()
+		for index, sketch in enumerate(self.sketches):
+			result += sketch.build(index >= self.EAGER_PREVIEWS)
 
 		return result
 
 	def build_games(self):
 		result = ""
 
-		for game in self.games:
-			result += game.build()
+		for index, game in enumerate(self.games):
+			result += game.build(index >= self.EAGER_PREVIEWS)
 
 		return result
 
 	def build_work(self):
 		result = ""
 
-		for work in self.work:
-			result += work.build()
+		for index, work in enumerate(self.work):
+			result += work.build(index >= self.EAGER_PREVIEWS)
 
 		return result
 
-	def build_sitemap(self):
-		contents = "<?xml version=\"1.0\" encoding=\"UTF-8\"?><urlset xmlns=\"http://www.sitemaps.org/schemas/sitemap/0.9\">"
+	def get_lastmod(self, url, digest, default):
+		return self.lastmod.get(url, digest, default, self.timestamp.strftime("%Y-%m-%d"))
 
+	def get_sitemap_entries(self):
 		for page in self.MENU_PAGES:
-			contents += "<url><loc>https://jobtalle.com/" + page + "</loc><changefreq>weekly</changefreq><priority>" + ("1" if page == "index.html" else "0.75") + "</priority></url>"
+			digest = self.manifest.get_digest(page)
 
-		for post in self.posts:
-			contents += "<url>"
-			contents += "<loc>https://jobtalle.com/" + post.get_post_file_name() + "</loc>"
-			contents += "<lastmod>" + post.get_lastmod() + "</lastmod>"
-			contents += "<changefreq>monthly</changefreq>"
-			contents += "<priority>0.5</priority>"
-			contents += "</url>"
-
-		contents += "</urlset>"
-
-		file = open("sitemap.xml", "w")
-		file.write(contents)
-		file.close()
-
-	def build_rss(self):
-		contents = "<?xml version=\"1.0\" encoding=\"UTF-8\"?>"
-		contents += "<rss version=\"2.0\"><channel>"
-		contents += "<title>" + self.TITLE + "</title>"
-		contents += "<description>" + self.DESCRIPTION.replace('&', "and") + "</description>"
-		contents += "<link>https://jobtalle.com</link>"
-		contents += "<lastBuildDate>" + self.posts[0].get_lastmod_rss() + "</lastBuildDate>"
-		contents += "<ttl>1440</ttl>"
+			yield \
+				"<url><loc>" + self.URL + page + "</loc><lastmod>" +\
+				self.get_lastmod(page, "" if digest is None else digest[0], self.timestamp.strftime("%Y-%m-%d")) +\
+				"</lastmod><priority>" + ("1" if page == "index.html" else "0.75") + "</priority></url>"
 
 		for post in self.posts:
-			contents += "<item>"
-			contents += "<title>" + post.get_title() + "</title>"
-			contents += "<description>" + post.get_description() + "</description>"
-			contents += "<link>https://jobtalle.com/" + post.get_post_file_name() + "</link>"
-			contents += "<guid isPermaLink=\"true\">https://jobtalle.com/" + post.get_post_file_name() + "</guid>"
-			contents += "<pubDate>" + post.get_lastmod_rss() + "</pubDate>"
-			contents += "</item>"
+			yield \
+				"<url><loc>" + self.URL + post.get_post_file_name() + "</loc><lastmod>" +\
+				self.get_lastmod(post.get_post_file_name(), self.hash_files([post.content, post.properties_file]), post.get_lastmod()) +\
+				"</lastmod><priority>0.5</priority></url>"
+
+	def get_sitemap_shards(self):
+		shards = []
+		size = 0
+		limit = self.SITEMAP_BYTES - len(self.SITEMAP_HEADER) - len(self.SITEMAP_FOOTER)
+
+		for entry in self.get_sitemap_entries():
+			data = entry.encode("utf-8")
+
+			if not shards or shards[-1][0] == self.SITEMAP_URLS or size + len(data) > limit:
+				shards.append([0, hashlib.sha1(), ""])
+				size = 0
+
+			shards[-1][0] += 1
+			shards[-1][1].update(data)
+			shards[-1][2] = max(shards[-1][2], self.REGEX_LASTMOD.search(entry).group(1))
+			size += len(data)
+
+		return [[count, digest.hexdigest(), lastmod] for count, digest, lastmod in shards]
+
+	def get_sitemap_file_name(self, index):
+		return "sitemap" + str(index + 1) + ".xml"
+
+	def stream_sitemap_shard(self, start, count):
+		yield self.SITEMAP_HEADER
+
+		for index, entry in enumerate(self.get_sitemap_entries()):
+			if index >= start + count:
+				break
+
+			if index >= start:
+				yield entry
 
-		contents += "</channel></rss>"
+		yield self.SITEMAP_FOOTER
 
-		file = open("rss.xml", "w")
-		file.write(contents)
-		file.close()
+	def build_sitemap_shard(self, index, start, count, digest):
+		file = self.get_sitemap_file_name(index)
+		dependencies = {"$urls$": digest}
+
+		if self.is_current(file, dependencies):
+			self.log("Skipping " + file + ", it is up to date")
+
+			return
+
+		self.log("Building " + file + " with " + str(count) + " URLs")
+
+		self.write(file, self.stream_sitemap_shard(start, count), False)
+
+		self.record(file, dependencies)
+
+	def build_sitemap(self):
+		shards = self.get_sitemap_shards()
+		index = "<?xml version=\"1.0\" encoding=\"UTF-8\"?><sitemapindex xmlns=\"http://www.sitemaps.org/schemas/sitemap/0.9\">"
+		start = 0
+
+		self.lastmod.save()
+
+		self.log("Building sitemap for " + str(sum(count for count, digest, lastmod in shards)) + " URLs in " + str(len(shards)) + " shards")
+		self.log_scope_increment()
+
+		for shard, [count, digest, lastmod] in enumerate(shards):
+			self.build_sitemap_shard(shard, start, count, digest)
+
+			start += count
+			index += \
+				"<sitemap><loc>" + self.URL + self.get_sitemap_file_name(shard) + "</loc><lastmod>" +\
+				lastmod +\
+				"</lastmod></sitemap>"
+
+		index += "</sitemapindex>"
+		dependencies = {"$sitemaps$": hash_string(index)}
+
+		if self.is_current("sitemap.xml", dependencies):
+			self.log("Skipping sitemap.xml, it is up to date")
+		else:
+			self.log("Building sitemap.xml")
+
+			self.write("sitemap.xml", [index], False)
+
+			self.record("sitemap.xml", dependencies)
+
+		self.log_scope_decrement()
+
+	def get_feed_file_name(self, format, archive=None):
+		if archive is None:
+			return self.FEED_FILES[format]
+
+		name, extension = os.path.splitext(self.FEED_FILES[format])
+
+		return name + "-" + str(archive) + extension
+
+	def get_feed_links(self, format, archive, archives):
+		links = []
+
+		if archive is not None:
+			links.append(["current", self.get_feed_file_name(format)])
+
+			if archive > 1:
+				links.append(["prev-archive", self.get_feed_file_name(format, archive - 1)])
+
+			if archive < archives:
+				links.append(["next-archive", self.get_feed_file_name(format, archive + 1)])
+		elif archives > 0:
+			links.append(["prev-archive", self.get_feed_file_name(format, archives)])
+
+		return links
+
+	def stream_rss(self, file, posts, archive, links):
+		namespaces = ""
+
+		if links:
+			namespaces += " xmlns:atom=\"http://www.w3.org/2005/Atom\""
+
+		if archive is not None:
+			namespaces += " xmlns:fh=\"" + self.FEED_HISTORY + "\""
+
+		if self.options.feed_content:
+			namespaces += " xmlns:content=\"http://purl.org/rss/1.0/modules/content/\""
+
+		yield "<?xml version=\"1.0\" encoding=\"UTF-8\"?>"
+		yield "<rss version=\"2.0\"" + namespaces + "><channel>"
+		yield "<title>" + self.TITLE + "</title>"
+		yield "<description>" + self.DESCRIPTION.replace('&', "and") + "</description>"
+		yield "<link>https://jobtalle.com</link>"
+		yield "<lastBuildDate>" + posts[0].get_lastmod_rss() + "</lastBuildDate>"
+		yield "<ttl>1440</ttl>"
+
+		if archive is not None:
+			yield "<fh:archive/>"
+
+		for rel, href in links:
+			yield "<atom:link rel=\"" + rel + "\" href=\"" + self.URL + href + "\"/>"
+
+		for post in posts:
+			yield "<item>"
+			yield "<title>" + html.escape(post.get_title(), False) + "</title>"
+			yield "<description>" + html.escape(post.get_description(), False) + "</description>"
+			yield "<link>https://jobtalle.com/" + post.get_post_file_name() + "</link>"
+			yield "<guid isPermaLink=\"true\">https://jobtalle.com/" + post.get_post_file_name() + "</guid>"
+			yield "<pubDate>" + post.get_lastmod_rss() + "</pubDate>"
+
+			if self.options.feed_content:
+				yield "<content:encoded><![CDATA[" + post.get_feed_content().replace("]]>", "]]]]><![CDATA[>") + "]]></content:encoded>"
+
+			yield "</item>"
+
+		yield "</channel></rss>"
+
+	def stream_atom(self, file, posts, archive, links):
+		yield "<?xml version=\"1.0\" encoding=\"UTF-8\"?>"
+		yield "<feed xmlns=\"http://www.w3.org/2005/Atom\"" + ("" if archive is None else " xmlns:fh=\"" + self.FEED_HISTORY + "\"") + ">"
+		yield "<title>" + self.TITLE + "</title>"
+		yield "<subtitle>" + html.escape(self.DESCRIPTION, False) + "</subtitle>"
+		yield "<link href=\"" + self.URL + "\"/>"
+		yield "<link rel=\"self\" href=\"" + self.URL + file + "\"/>"
+		yield "<id>" + self.URL + file + "</id>"
+		yield "<updated>" + posts[0].get_lastmod_atom() + "</updated>"
+		yield "<author><name>" + self.TITLE + "</name></author>"
+
+		if archive is not None:
+			yield "<fh:archive/>"
+
+		for rel, href in links:
+			yield "<link rel=\"" + rel + "\" href=\"" + self.URL + href + "\"/>"
+
+		for post in posts:
+			yield "<entry>"
+			yield "<title>" + html.escape(post.get_title(), False) + "</title>"
+			yield "<link href=\"" + self.URL + post.get_post_file_name() + "\"/>"
+			yield "<id>" + self.URL + post.get_post_file_name() + "</id>"
+			yield "<published>" + post.get_lastmod_atom() + "</published>"
+			yield "<updated>" + post.get_lastmod_atom() + "</updated>"
+			yield "<summary>" + html.escape(post.get_description(), False) + "</summary>"
+
+			if self.options.feed_content:
+				yield "<content type=\"html\">" + html.escape(post.get_feed_content(), False) + "</content>"
+
+			yield "</entry>"
+
+		yield "</feed>"
+
+	def stream_json_feed(self, file, posts, archive, links):
+		feed = {
+			"version": "https://jsonfeed.org/version/1.1",
+			"title": self.TITLE,
+			"home_page_url": self.URL,
+			"feed_url": self.URL + file,
+			"description": self.DESCRIPTION,
+			"authors": [{"name": self.TITLE, "url": self.URL}],
+			"language": "en-US",
+			"items": []
+		}
+
+		for rel, href in links:
+			if rel == "prev-archive":
+				feed["next_url"] = self.URL + href
+
+		for post in posts:
+			item = {
+				"id": self.URL + post.get_post_file_name(),
+				"url": self.URL + post.get_post_file_name(),
+				"title": post.get_title(),
+				"summary": post.get_description(),
+				"image": self.URL + post.get_preview_file(),
+				"date_published": post.get_lastmod_atom()
+			}
+
+			if self.options.feed_content:
+				item["content_html"] = post.get_feed_content()
+			else:
+				item["content_text"] = post.get_description()
+
+			feed["items"].append(item)
+
+		yield json.dumps(feed, separators=(",", ":"))
+
+	def get_feed_dependencies(self, format, posts, links):
+		files = []
+
+		for post in posts:
+			files.append(post.properties_file)
+
+			if self.options.feed_content:
+				files.append(post.content)
+
+		return {
+			__file__: self.hash_file(__file__),
+			"$feed$": format + " " + str(self.options.feed_content),
+			self.DIR_POSTS: self.hash_files(files),
+			"$posts$": " ".join(post.directory for post in posts),
+			"$links$": " ".join(rel + " " + href for rel, href in links)
+		}
+
+	def build_feed(self, format, posts, archive, archives):
+		file = self.get_feed_file_name(format, archive)
+		links = self.get_feed_links(format, archive, archives)
+		dependencies = self.get_feed_dependencies(format, posts, links)
+
+		if self.is_current(file, dependencies):
+			self.log("Skipping " + file + ", it is up to date")
+
+			return
+
+		self.log("Building " + file + " with " + str(len(posts)) + " items")
+
+		if format == self.FEED_RSS:
+			stream = self.stream_rss(file, posts, archive, links)
+		elif format == self.FEED_ATOM:
+			stream = self.stream_atom(file, posts, archive, links)
+		else:
+			stream = self.stream_json_feed(file, posts, archive, links)
+
+		self.write(file, stream, False)
+
+		self.record(file, dependencies)
+
+	def build_feeds(self):
+		if not self.posts:
+			return
+
+		items = self.options.feed_items
+		archives = len(self.posts) // items if len(self.posts) > items else 0
+		documents = [[None, list(self.posts[:items])]]
+
+		for archive in range(1, archives + 1):
+			documents.append([archive, list(self.posts[len(self.posts) - archive * items:len(self.posts) - (archive - 1) * items])])
+
+		for format in self.options.feeds:
+			for archive, posts in documents:
+				self.build_feed(format, posts, archive, archives)
 
 	def get_index_count(self):
-		return int(math.ceil(float(self.get_post_count()) / self.INDEX_LINKS_PER_PAGE))
+		return int(math.ceil(float(self.get_post_count()) / self.options.page_size))
 
 	def get_post_count(self):
 		return len(self.posts)
 
 	def build_indices(self):
-		self.log("Building index for " + str(len(self.post_links)) + " pages")
+		self.log("Building index for " + str(self.get_post_count()) + " pages")
 		self.log_scope_increment()
 
 		for i in range(0, self.get_index_count()):
-			self.build_index(i, i * self.INDEX_LINKS_PER_PAGE, min(self.get_post_count(), (i + 1) * self.INDEX_LINKS_PER_PAGE))
+			self.build_index(i, i * self.options.page_size, min(self.get_post_count(), (i + 1) * self.options.page_size))
 
+		self.log_index_sizes()
 		self.log_scope_decrement()
 
+	def log_index_sizes(self):
+		sizes = []
+
+		for i in range(1, self.get_index_count()):
+			file = self.get_index_file_name(i)
+
+			if os.path.isfile(file + ".gz"):
+				sizes.append(os.path.getsize(file + ".gz"))
+			elif os.path.isfile(file):
+				sizes.append(os.path.getsize(file))
+
+		if not sizes:
+			return
+
+		self.log(
+			"Index pages load " + str(self.get_index_count() - 1) + " shards of up to " + str(self.options.page_size) +
+			" posts, " + str(min(sizes)) + " to " + str(max(sizes)) + " bytes, " + str(sum(sizes) // len(sizes)) + " on average")
+
 	def get_index_file_name(self, index):
 		if index == 0:
 			return "index.html"
@@ -652,59 +3528,234 @@ class Site:
 			return "index" + str(index) + ".html"
 
 	def get_load_more(self):
-		load_more_file = open(os.path.join(self.DIR_TEMPLATES, self.FILE_LOADMORE))
-		load_more = load_more_file.read()
-		load_more_file.close()
+		return resources.read(os.path.join(self.DIR_TEMPLATES, self.FILE_LOADMORE))
+
+	def get_index_dependencies(self, start, end):
+		dependencies = self.get_template_dependencies()
+		dependencies[os.path.join(self.DIR_TEMPLATES, self.FILE_LOADMORE)] = self.hash_file(os.path.join(self.DIR_TEMPLATES, self.FILE_LOADMORE))
+		dependencies[self.DIR_POSTS] = self.hash_files([file for post in self.posts[start:end] for file in [post.properties_file, post.get_preview_file()]])
+		dependencies["$posts$"] = " ".join(post.directory for post in self.posts[start:end])
+		dependencies["$indices$"] = str(self.get_index_count())
+		dependencies["$search$"] = str(self.options.search)
+
+		return dependencies
 
-		return load_more
+	def stream_index_content(self, index, start, end):
+		if index == 0 and self.options.search:
+			yield self.SEARCH_FORM
+
+		for i in range(start, end):
+			if index == 0 and i < self.EAGER_PREVIEWS:
+				yield self.posts[i].build_post_link(False)
+			else:
+				yield self.posts[i].get_post_link()
+
+		if index == 0 and self.get_index_count() > 1:
+			yield self.get_load_more()
 
 	def build_index(self, index, start ,end):
+		dependencies = self.get_index_dependencies(start, end)
+
+		if self.is_current(self.get_index_file_name(index), dependencies):
+			self.log("Skipping " + self.get_index_file_name(index) + ", it is up to date")
+
+			return
+
 		if start == end - 1:
 			self.log("Building index for post #" + str(start))
 		else:
 			self.log("Building index for posts #" + str(start) + " to #" + str(end - 1))
 
-		content = ""
-
-		for i in range(start, end):
-			content = content + self.post_links[i]
+		content = self.stream_index_content(index, start, end)
 
 		if index == 0:
+			post_script = ""
+
 			if self.get_index_count() > 1:
-				content += self.get_load_more()
+				post_script += "<script>var indices = " + str(self.get_index_count()) + ";</script>" + self.SCRIPT_LOAD_MORE
 
-			result = replace_keys({
+			if self.options.search:
+				post_script += self.SCRIPT_SEARCH
+
+			result = self.stream_page(self.get_index_file_name(index), {
 				self.KEY_TITLE: self.TITLE,
 				self.KEY_DESCRIPTION: self.DESCRIPTION,
 				self.KEY_ADDITIONAL_CSS: "",
 				self.KEY_MENU_BUTTONS: self.build_menu("index.html"),
 				self.KEY_CONTENT: content,
-				self.KEY_POST_SCRIPT: "<script>var indices = " + str(self.get_index_count()) + ";</script>" + self.SCRIPT_LOAD_MORE if self.get_index_count() > 1 else "",
-				self.KEY_YEAR: str(datetime.datetime.now().year),
-				self.KEY_META: ""
-			}, self.template)
+				self.KEY_POST_SCRIPT: post_script,
+				self.KEY_YEAR: self.get_year(),
+				self.KEY_META: self.get_hints(
+					self.get_index_file_name(index),
+					[post.get_preview_file() for post in self.posts[start:min(end, start + self.EAGER_PREVIEWS)]],
+					[])
+			})
 		else:
 			result = content
 
-		file = open(self.get_index_file_name(index), "w")
-		file.write(compress(result))
-		file.close()
+		self.write(self.get_index_file_name(index), result)
+
+		self.record(self.get_index_file_name(index), dependencies)
+
+	def write(self, file, fragments, compressed=True):
+		with profiler.phase("write"):
+			output = open(get_temporary_file(file), "w", buffering=self.WRITE_BUFFER_SIZE)
+			references = {}
+
+			if compressed:
+				if self.options.fingerprint:
+					def rewrite(reference):
+						asset = self.get_asset(reference)
+
+						if asset is None:
+							return reference
+
+						references[reference] = asset
+
+						return asset
+
+					minifier = Minifier(rewrite)
+				else:
+					minifier = Minifier()
+				minify_time = 0.0
+
+				for fragment in fragments:
+					start = time.perf_counter()
+					minified = minifier.feed(fragment)
+					minify_time = minify_time + time.perf_counter() - start
+
+					output.write(minified)
+
+				start = time.perf_counter()
+				minified = minifier.close()
+				minify_time = minify_time + time.perf_counter() - start
+
+				output.write(minified)
+
+				profiler.count("size_raw", minifier.bytes_in)
+				profiler.count("size_minified", minifier.bytes_out)
+				profiler.count("time_minify", minify_time)
+
+				self.log("Minified " + file + ", saved " + str(minifier.get_saved()) + " of " + str(minifier.bytes_in) + " bytes")
+			else:
+				for fragment in fragments:
+					output.write(fragment)
+
+			output.close()
+
+			self.replace(file)
+
+			if self.options.fingerprint:
+				self.manifest.set(Manifest.TABLE_REFERENCES, file, references)
+
+		self.update_sidecars(file)
+
+	def replace(self, file):
+		size = os.path.getsize(get_temporary_file(file))
+
+		if replace_file(file, get_temporary_file(file)):
+			profiler.count("bytes_written", size)
+
+			return True
+
+		profiler.count("files_unchanged", 1)
+
+		self.log("Kept " + file + ", its content did not change")
+
+		return False
+
+	@staticmethod
+	def compress_gzip(data):
+		compressor = zlib.compressobj(zlib.Z_BEST_COMPRESSION, zlib.DEFLATED, 16 + zlib.MAX_WBITS, 9)
+
+		return compressor.compress(data) + compressor.flush()
+
+	@staticmethod
+	def compress_zstd(data):
+		return zstd.compress(data, zstd.CompressionParameter.compression_level.bounds()[1])
+
+	def get_codecs(self):
+		codecs = [(".gz", self.compress_gzip)]
+
+		if zstd is not None:
+			codecs.append((".zst", self.compress_zstd))
+
+		return codecs
+
+	def update_sidecars(self, file):
+		with profiler.phase("sidecars"):
+			self.write_sidecars(file)
+
+	@staticmethod
+	def get_stat(file):
+		try:
+			stat = os.stat(file)
+		except FileNotFoundError:
+			return None
+
+		return [stat.st_size, stat.st_mtime_ns]
+
+	def get_stats(self, file, extensions):
+		return {output: self.get_stat(output) for output in [file] + [file + extension for extension in extensions]}
+
+	def write_sidecars(self, file):
+		recorded = self.manifest.get_digest(file)
+
+		if recorded is not None and len(recorded) == 3 and self.get_stats(file, recorded[1]) == recorded[2]:
+			return
+
+		source_file = open(file, "rb")
+		data = source_file.read()
+		source_file.close()
+
+		profiler.count("bytes_read", len(data))
+
+		digest = hashlib.sha1(data).hexdigest()
+
+		if recorded is not None and len(recorded) == 3 and recorded[0] == digest:
+			stats = self.get_stats(file, recorded[1])
+
+			if all(stats[file + extension] is not None and stats[file + extension] == recorded[2].get(file + extension) for extension in recorded[1]):
+				self.manifest.record_digest(file, [digest, recorded[1], stats])
+
+				return
+
+		written = []
+
+		for extension, compress in self.get_codecs():
+			compressed = compress(data)
+
+			if len(compressed) < len(data):
+				sidecar = open(get_temporary_file(file + extension), "wb")
+				sidecar.write(compressed)
+				sidecar.close()
+
+				self.replace(file + extension)
+
+				written.append(extension)
+
+				profiler.count("size_compressed", len(compressed))
+
+				self.log("Compressed " + file + extension + " to " + str(len(compressed)) + " of " + str(len(data)) + " bytes")
+			elif os.path.isfile(file + extension):
+				os.remove(file + extension)
+
+		self.manifest.record_digest(file, [digest, written, self.get_stats(file, written)])
+
+	def get_log_scope(self):
+		return getattr(self.local, "log_scope", 0)
+
+	def set_log_scope(self, log_scope):
+		self.local.log_scope = log_scope
 
 	def log(self, message):
-		print('\t' * self.log_scope + message)
+		print('\t' * self.get_log_scope() + message)
 
 	def log_scope_increment(self):
-		self.log_scope = self.log_scope + 1
+		self.set_log_scope(self.get_log_scope() + 1)
 
 	def log_scope_decrement(self):
-		self.log_scope = self.log_scope - 1
-
-	def read_template(self):
-		template_file = open(os.path.join(self.DIR_TEMPLATES, self.FILE_TEMPLATE))
-		template = template_file.read()
-		template_file.close()
-
-		return template
+		self.set_log_scope(self.get_log_scope() - 1)
 
 	def abort(self):
 		self.log("Aborting...")
@@ -727,46 +3778,290 @@ class Site:
 			self.log("Directory " + self.DIR_JAVASCRIPT + " was not found")
 			self.abort()
 
-	def get_posts(self):
+	def list_posts(self):
 		directories = [dir for dir in listdir(self.DIR_POSTS) if not dir.startswith("_")]
-		print(directories)
 		directories.sort(key=lambda x: datetime.datetime.strptime(x, '%Y_%m_%d'), reverse=True)
 
-		return [Post(self, dir) for dir in directories]
+		return directories
 
-	def get_sketches(self):
+	def list_sketches(self):
 		directories = [dir for dir in listdir(self.DIR_SKETCHES)]
 		directories.sort(key=lambda x: datetime.datetime.strptime(x, '%Y_%m_%d'), reverse=True)
 
-		return [Sketch(self, dir) for dir in directories]
+		return directories
 
-	def get_games(self):
+	def list_games(self):
 		directories = [dir for dir in listdir(self.DIR_GAMES)]
 		directories.sort()
 
-		return [Product(self, self.DIR_GAMES + "\\" + dir) for dir in directories]
+		return directories
 
-	def get_work(self):
+	def list_work(self):
 		directories = [dir for dir in listdir(self.DIR_WORK)]
 		directories.sort(reverse=True)
 
-		return [Product(self, self.DIR_WORK + "\\" + dir) for dir in directories]
+		return directories
 
+	def get_posts(self):
+		return CatalogSection(self, self.DIR_POSTS, self.catalog.get_names(self.DIR_POSTS, self.list_posts), Post)
 
-def main():
-	site = None
+	def get_sketches(self):
+		return CatalogSection(self, self.DIR_SKETCHES, self.catalog.get_names(self.DIR_SKETCHES, self.list_sketches), Sketch)
+
+	def get_games(self):
+		return CatalogSection(self, self.DIR_GAMES, self.catalog.get_names(self.DIR_GAMES, self.list_games), Product, self.DIR_GAMES + "/")
+
+	def get_work(self):
+		return CatalogSection(self, self.DIR_WORK, self.catalog.get_names(self.DIR_WORK, self.list_work), Product, self.DIR_WORK + "/")
+
+
+class Watcher:
+	DIRECTORIES_SOURCES = [
+		Site.DIR_POSTS,
+		Site.DIR_TEMPLATES,
+		Site.DIR_SKETCHES,
+		Site.DIR_GAMES,
+		Site.DIR_WORK,
+		Site.DIR_IMAGES
+	]
+	DIRECTORIES_ASSETS = [
+		Site.DIR_CSS,
+		Site.DIR_JAVASCRIPT
+	]
+
+	INTERVAL = 0.05
+
+	def __init__(self):
+		self.sources = self.scan(self.DIRECTORIES_SOURCES)
+		self.assets = self.scan(self.DIRECTORIES_ASSETS)
+
+	@staticmethod
+	def scan(directories):
+		snapshot = {}
+		pending = [directory for directory in directories if os.path.isdir(directory)]
+
+		while pending:
+			for entry in os.scandir(pending.pop()):
+				if entry.is_dir():
+					pending.append(entry.path)
+				else:
+					status = entry.stat()
+					snapshot[entry.path] = (status.st_mtime_ns, status.st_size)
+
+		return snapshot
+
+	def poll(self):
+		sources = self.scan(self.DIRECTORIES_SOURCES)
+		assets = self.scan(self.DIRECTORIES_ASSETS)
+
+		sources_changed = sources != self.sources
+		assets_changed = assets != self.assets
+
+		self.sources = sources
+		self.assets = assets
+
+		return sources_changed, assets_changed
+
+
+class PreviewServer(http.server.ThreadingHTTPServer):
+	daemon_threads = True
+
+	def __init__(self, address):
+		super().__init__(address, PreviewHandler)
+
+		self.generation = 0
+		self.changed = threading.Condition()
+
+	def reload(self):
+		with self.changed:
+			self.generation = self.generation + 1
+			self.changed.notify_all()
+
+
+class PreviewHandler(http.server.SimpleHTTPRequestHandler):
+	PATH_RELOAD = "/__reload"
 
-	if len(argv) > 1:
-		if argv[1] == "clean":
-			Site.clean()
+	SCRIPT_RELOAD = b"<script>new EventSource(\"/__reload\").onmessage=function(){location.reload()}</script>"
+
+	KEEPALIVE_INTERVAL = 15
+
+	def log_message(self, format, *args):
+		pass
+
+	def send_reload_events(self):
+		self.send_response(200)
+		self.send_header("Content-Type", "text/event-stream")
+		self.send_header("Cache-Control", "no-cache")
+		self.end_headers()
+
+		generation = self.server.generation
+
+		try:
+			while True:
+				with self.server.changed:
+					self.server.changed.wait_for(lambda: self.server.generation != generation, self.KEEPALIVE_INTERVAL)
+
+				if self.server.generation != generation:
+					generation = self.server.generation
+					self.wfile.write(b"data: reload\n\n")
+				else:
+					self.wfile.write(b": keepalive\n\n")
+
+				self.wfile.flush()
+		except (BrokenPipeError, ConnectionResetError):
+			pass
+
+	def do_GET(self):
+		path = self.path.split("?")[0].split("#")[0]
+
+		if path == self.PATH_RELOAD:
+			self.send_reload_events()
 
 			return
-		else:
-			site = Site(argv[1])
 
-	if site is None:
-		site = Site()
-		site.clean()
+		file = self.translate_path(path)
+
+		if os.path.isdir(file):
+			file = os.path.join(file, "index.html")
+
+		if not os.path.isfile(file):
+			self.send_error(404)
+
+			return
+
+		source = open(file, "rb")
+		data = source.read()
+		source.close()
+
+		if file.endswith(".html"):
+			if b"</body>" in data:
+				data = data.replace(b"</body>", self.SCRIPT_RELOAD + b"</body>", 1)
+			else:
+				data = data + self.SCRIPT_RELOAD
+
+		etag = "\"" + hashlib.sha1(data).hexdigest() + "\""
+
+		if self.headers.get("If-None-Match") == etag:
+			self.send_response(304)
+			self.send_header("ETag", etag)
+			self.end_headers()
+
+			return
+
+		self.send_response(200)
+		self.send_header("Content-Type", mimetypes.guess_type(file)[0] or "application/octet-stream")
+		self.send_header("Content-Length", str(len(data)))
+		self.send_header("Cache-Control", "no-cache")
+		self.send_header("ETag", etag)
+		self.end_headers()
+		self.wfile.write(data)
+
+
+def rebuild(options):
+	start = time.perf_counter()
+
+	try:
+		build(None, options)
+	except (Exception, SystemExit):
+		traceback.print_exc()
+
+		return False
+	finally:
+		profiler.pop_records()
+
+	print("Rebuilt in " + str(int((time.perf_counter() - start) * 1000)) + " ms")
+
+	return True
+
+def watch(options):
+	rebuild(options)
+
+	watcher = Watcher()
+	server = PreviewServer((options.host, options.port))
+	thread = threading.Thread(target=server.serve_forever, daemon=True)
+	thread.start()
+
+	print("Serving on http://" + options.host + ":" + str(options.port) + "/, watching for changes")
+
+	try:
+		while True:
+			time.sleep(Watcher.INTERVAL)
+
+			sources_changed, assets_changed = watcher.poll()
+
+			if sources_changed or (assets_changed and (options.fingerprint or options.bundle or options.critical_css or options.service_worker)):
+				if rebuild(options):
+					server.reload()
+			elif assets_changed:
+				server.reload()
+	except KeyboardInterrupt:
+		server.shutdown()
+
+def parse_arguments(arguments):
+	parser = argparse.ArgumentParser(description="Build the site from its templates and sources.")
+	parser.add_argument("target", nargs="?", help="\"clean\" to remove all generated pages, \"watch\" to serve the site and rebuild it on changes, or the file name of a single post to build")
+	parser.add_argument("-j", "--jobs", type=int, default=1, help="number of processes used to render posts, 0 uses every core")
+	parser.add_argument("--host", default="localhost", help="host the watch mode preview server binds to")
+	parser.add_argument("--port", type=int, default=8000, help="port the watch mode preview server listens on")
+	parser.add_argument("--report", help="write a JSON report with the time and bytes spent in every build phase to this file")
+	parser.add_argument("--profile", help="write cProfile statistics of the build to this file")
+	parser.add_argument("--fingerprint", action="store_true", help="reference content hashed copies of CSS, JavaScript and images in the " + Site.DIR_ASSETS + " directory")
+	parser.add_argument("--bundle", action="store_true", help="bundle the stylesheets and consecutive local scripts of every post into one inlined or content hashed file")
+	parser.add_argument("--critical-css", action="store_true", help="inline the rules of the site stylesheet each page uses and load the full stylesheet asynchronously")
+	parser.add_argument("--icons", choices=Template.ICONS, default=Template.ICONS_INLINE, help="inline every icon, reference them from a cached " + Template.FILE_SPRITE + " sprite, or share repeated icons through one inlined <defs> block")
+	parser.add_argument("--search", action="store_true", help="build a sharded full text search index of all posts in the " + SearchIndex.DIR + " directory")
+	parser.add_argument("--hints", action="store_true", help="add preload, prefetch and speculation rules hints for the images and pages a visitor will likely need next")
+	parser.add_argument("--service-worker", action="store_true", help="register a " + Site.FILE_SERVICE_WORKER + " service worker that precaches every page and serves fingerprinted assets cache first and everything else stale while revalidating")
+	parser.add_argument("--feeds", nargs="+", choices=Site.FEEDS, default=[Site.FEED_RSS], help="feed formats to publish, RSS in rss.xml, Atom in atom.xml and JSON Feed in feed.json")
+	parser.add_argument("--feed-items", type=int, default=Site.FEED_ITEMS, help="number of recent posts in every feed, older posts move to paged archive feeds")
+	parser.add_argument("--feed-content", action="store_true", help="include the full content of every post in the feeds")
+	parser.add_argument("--page-size", type=int, default=Site.INDEX_LINKS_PER_PAGE, help="number of post links on every index page")
+	parser.add_argument("--related", type=int, default=0, help="number of similar posts linked below every post, 0 disables the related posts")
+	parser.add_argument("--timestamp", type=int, help="build time in seconds since the epoch, defaults to SOURCE_DATE_EPOCH or the current time")
+
+	options = parser.parse_args(arguments)
+
+	if options.page_size < 1:
+		parser.error("--page-size must be at least 1")
+
+	if options.feed_items < 1:
+		parser.error("--feed-items must be at least 1")
+
+	if options.related < 0:
+		parser.error("--related must not be negative")
+
+	return options
+
+def main():
+	options = parse_arguments(argv[1:])
+
+	if options.target == "clean":
+		Site.clean()
+
+		return
+
+	if options.target == "watch":
+		watch(options)
+
+		return
+
+	start = time.perf_counter()
+
+	if options.profile is not None:
+		profile = cProfile.Profile()
+		profile.runcall(build, options.target, options)
+		profile.dump_stats(options.profile)
+	else:
+		build(options.target, options)
+
+	if options.report is not None:
+		profiler.write_report(options.report, time.perf_counter() - start)
+
+def build(exclusive, options):
+	if exclusive is not None:
+		site = Site(exclusive, options)
+	else:
+		site = Site(options=options)
 
 	site.build()
 
@@ -1,17 +1,108 @@
 var currentIndex = 0;
+var loading = false;
+var fragments = {};
+var fragmentCallbacks = {};
+var loadMoreObserver = null;
+
+function fetchIndex(index, callback) {
+	if (fragments.hasOwnProperty(index)) {
+		callback(fragments[index]);
+
+		return;
+	}
+
+	if (fragmentCallbacks.hasOwnProperty(index)) {
+		fragmentCallbacks[index].push(callback);
+
+		return;
+	}
 
-function loadMore() {
 	var request = new XMLHttpRequest();
 
-	request.open("GET", "index" + ++currentIndex + ".html", true);
+	fragmentCallbacks[index] = [callback];
+
+	request.open("GET", "index" + index + ".html", true);
 	request.onloadend = function() {
-		if (request.status >= 200 && request.status < 400) {
-			document.getElementById("content").innerHTML += request.responseText;
+		var fragment = null;
+		var callbacks = fragmentCallbacks[index];
 
-			if (currentIndex + 1 === indices)
-				document.getElementById("load-more").innerHTML = "";
+		if (request.status >= 200 && request.status < 400) {
+			fragment = request.responseText;
+			fragments[index] = fragment;
 		}
+
+		delete fragmentCallbacks[index];
+
+		for (var i = 0; i < callbacks.length; ++i)
+			callbacks[i](fragment);
 	};
 
 	request.send();
-}
\ No newline at end of file
+}
+
+function prefetchIndex() {
+	var index = currentIndex + 1;
+
+	if (index >= indices)
+		return;
+
+	var prefetch = function() {
+		fetchIndex(index, function() {});
+	};
+
+	if (window.requestIdleCallback)
+		window.requestIdleCallback(prefetch);
+	else
+		setTimeout(prefetch, 1);
+}
+
+function loadMore() {
+	if (loading || currentIndex + 1 >= indices)
+		return;
+
+	loading = true;
+
+	fetchIndex(currentIndex + 1, function(fragment) {
+		loading = false;
+
+		if (fragment === null)
+			return;
+
+		delete fragments[++currentIndex];
+
+		document.getElementById("content").insertAdjacentHTML("beforeend", fragment);
+
+		var button = document.getElementById("load-more");
+
+		if (currentIndex + 1 === indices) {
+			if (loadMoreObserver)
+				loadMoreObserver.disconnect();
+
+			button.innerHTML = "";
+
+			return;
+		}
+
+		if (loadMoreObserver) {
+			loadMoreObserver.unobserve(button);
+			loadMoreObserver.observe(button);
+		}
+
+		prefetchIndex();
+	});
+}
+
+function observeLoadMore() {
+	if (window.IntersectionObserver) {
+		loadMoreObserver = new IntersectionObserver(function(entries) {
+			if (entries[entries.length - 1].isIntersecting)
+				loadMore();
+		}, {rootMargin: "800px 0px"});
+
+		loadMoreObserver.observe(document.getElementById("load-more"));
+	}
+
+	prefetchIndex();
+}
+
+observeLoadMore();
\ No newline at end of file
@@ -0,0 +1,184 @@
+var searchCache = {};
+var searchPending = {};
+
+function searchFetch(file, callback) {
+	if (searchCache.hasOwnProperty(file)) {
+		callback(searchCache[file]);
+
+		return;
+	}
+
+	if (searchPending.hasOwnProperty(file)) {
+		searchPending[file].push(callback);
+
+		return;
+	}
+
+	var request = new XMLHttpRequest();
+
+	searchPending[file] = [callback];
+
+	request.open("GET", "search/" + file, true);
+	request.onloadend = function() {
+		var result = null;
+		var callbacks = searchPending[file];
+
+		if (request.status >= 200 && request.status < 400) {
+			result = JSON.parse(request.responseText);
+			searchCache[file] = result;
+		}
+
+		delete searchPending[file];
+
+		for (var i = 0; i < callbacks.length; ++i)
+			callbacks[i](result);
+	};
+
+	request.send();
+}
+
+function searchStem(index, term) {
+	for (var i = 0; i < index.suffixes.length; ++i) {
+		var suffix = index.suffixes[i][0];
+
+		if (term.length - suffix.length >= index.lengths[2] && term.slice(term.length - suffix.length) === suffix)
+			return term.slice(0, term.length - suffix.length) + index.suffixes[i][1];
+	}
+
+	return term;
+}
+
+function searchTerms(index, query) {
+	var words = query.toLowerCase().match(/[a-z0-9]+/g) || [];
+	var terms = [];
+
+	for (var i = 0; i < words.length; ++i) {
+		if (words[i].length < index.lengths[0] || words[i].length > index.lengths[1] || index.stopwords.indexOf(words[i]) !== -1)
+			continue;
+
+		var term = searchStem(index, words[i]);
+
+		if (terms.indexOf(term) === -1)
+			terms.push(term);
+	}
+
+	return terms;
+}
+
+function searchRank(index, terms, shards) {
+	var scores = null;
+
+	for (var i = 0; i < terms.length; ++i) {
+		var shard = shards[index.shards[terms[i].slice(0, index.prefix)]];
+
+		if (!shard || !shard.hasOwnProperty(terms[i]))
+			return [];
+
+		var postings = shard[terms[i]];
+		var weight = Math.log(1 + index.documents.length / (postings.length / 2));
+		var termScores = {};
+		var document = 0;
+
+		for (var posting = 0; posting < postings.length; posting += 2) {
+			document += postings[posting];
+			termScores[document] = postings[posting + 1] * weight;
+		}
+
+		if (scores === null)
+			scores = termScores;
+		else {
+			var combined = {};
+
+			for (var scored in scores)
+				if (termScores.hasOwnProperty(scored))
+					combined[scored] = scores[scored] + termScores[scored];
+
+			scores = combined;
+		}
+	}
+
+	var results = [];
+
+	for (var result in scores)
+		results.push({
+			url: index.documents[result][0],
+			title: index.documents[result][1],
+			score: scores[result]
+		});
+
+	results.sort(function(a, b) {
+		return b.score - a.score;
+	});
+
+	return results;
+}
+
+function search(query, callback) {
+	searchFetch("index.json", function(index) {
+		if (!index) {
+			callback([]);
+
+			return;
+		}
+
+		var terms = searchTerms(index, query);
+		var files = [];
+
+		for (var i = 0; i < terms.length; ++i) {
+			var prefix = terms[i].slice(0, index.prefix);
+
+			if (!index.shards.hasOwnProperty(prefix)) {
+				callback([]);
+
+				return;
+			}
+
+			if (files.indexOf(index.shards[prefix]) === -1)
+				files.push(index.shards[prefix]);
+		}
+
+		if (files.length === 0) {
+			callback([]);
+
+			return;
+		}
+
+		var shards = {};
+		var remaining = files.length;
+
+		files.forEach(function(file) {
+			searchFetch(file, function(shard) {
+				shards[file] = shard;
+
+				if (--remaining === 0)
+					callback(searchRank(index, terms, shards));
+			});
+		});
+	});
+}
+
+function searchAttach(input, list) {
+	var latest = 0;
+
+	input.addEventListener("input", function() {
+		var current = ++latest;
+
+		search(input.value, function(results) {
+			if (current !== latest)
+				return;
+
+			list.innerHTML = "";
+
+			for (var i = 0; i < results.length; ++i) {
+				var item = document.createElement("li");
+				var link = document.createElement("a");
+
+				link.href = results[i].url;
+				link.textContent = results[i].title;
+
+				item.appendChild(link);
+				list.appendChild(item);
+			}
+		});
+	});
+}
\ No newline at end of file
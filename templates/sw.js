@@ -0,0 +1,119 @@
+var PRECACHE = $precache$;
+var ASSETS = $assets$;
+var CACHE_PRECACHE = "precache";
+var CACHE_RUNTIME = "runtime";
+
+function getCacheKey(url) {
+	return new URL(url + "?revision=" + PRECACHE[url], self.registration.scope).href;
+}
+
+function getPath(request) {
+	var url = new URL(request.url);
+
+	if (url.origin !== self.location.origin || url.href.indexOf(self.registration.scope) !== 0)
+		return null;
+
+	var path = url.pathname.substring(new URL(self.registration.scope).pathname.length);
+
+	return path === "" ? "index.html" : path;
+}
+
+self.addEventListener("install", function(event) {
+	event.waitUntil(caches.open(CACHE_PRECACHE).then(function(cache) {
+		return Promise.all(Object.keys(PRECACHE).map(function(url) {
+			var key = getCacheKey(url);
+
+			return cache.match(key).then(function(cached) {
+				if (cached)
+					return;
+
+				return fetch(url, {cache: "no-cache"}).then(function(response) {
+					if (response.ok)
+						return cache.put(key, response);
+				}).catch(function() {});
+			});
+		}));
+	}).then(function() {
+		return self.skipWaiting();
+	}));
+});
+
+self.addEventListener("activate", function(event) {
+	var current = {};
+
+	for (var url in PRECACHE)
+		current[getCacheKey(url)] = true;
+
+	event.waitUntil(Promise.all([caches.open(CACHE_PRECACHE), caches.open(CACHE_RUNTIME)]).then(function(opened) {
+		return opened[0].keys().then(function(requests) {
+			return Promise.all(requests.filter(function(request) {
+				return !current[request.url];
+			}).map(function(request) {
+				var url = new URL(request.url);
+
+				url.search = "";
+
+				return Promise.all([opened[0].delete(request), opened[1].delete(url.href)]);
+			}));
+		});
+	}).then(function() {
+		return self.clients.claim();
+	}));
+});
+
+function matchPrecache(path) {
+	if (!PRECACHE.hasOwnProperty(path))
+		return Promise.resolve(undefined);
+
+	return caches.open(CACHE_PRECACHE).then(function(cache) {
+		return cache.match(getCacheKey(path));
+	});
+}
+
+function updateRuntime(request) {
+	return fetch(request).then(function(response) {
+		if (response.ok) {
+			var copy = response.clone();
+
+			caches.open(CACHE_RUNTIME).then(function(cache) {
+				cache.put(request, copy);
+			});
+		}
+
+		return response;
+	});
+}
+
+function staleWhileRevalidate(event, path) {
+	var network = updateRuntime(event.request);
+
+	event.waitUntil(network.catch(function() {}));
+	event.respondWith(caches.match(event.request, {cacheName: CACHE_RUNTIME, ignoreSearch: true}).then(function(cached) {
+		return cached || matchPrecache(path).then(function(precached) {
+			return precached || network;
+		});
+	}));
+}
+
+function cacheFirst(event, path) {
+	event.respondWith(matchPrecache(path).then(function(precached) {
+		return precached || caches.match(event.request, {cacheName: CACHE_RUNTIME}).then(function(cached) {
+			return cached || updateRuntime(event.request);
+		});
+	}));
+}
+
+self.addEventListener("fetch", function(event) {
+	if (event.request.method !== "GET")
+		return;
+
+	var path = getPath(event.request);
+
+	if (path === null)
+		return;
+
+	if (path.indexOf(ASSETS) === 0)
+		cacheFirst(event, path);
+	else
+		staleWhileRevalidate(event, path);
+});
\ No newline at end of file
@@ -0,0 +1,362 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import struct
+import subprocess
+import tempfile
+import unittest
+
+import build
+
+
+class TestParseArguments(unittest.TestCase):
+	def parse_error(self, arguments):
+		with self.assertRaises(SystemExit) as context:
+			build.parse_arguments(arguments)
+
+		return context.exception.code
+
+	def test_related_defaults_to_disabled(self):
+		self.assertEqual(build.parse_arguments([]).related, 0)
+
+	def test_related_accepts_positive_counts(self):
+		self.assertEqual(build.parse_arguments(["--related", "3"]).related, 3)
+
+	def test_related_rejects_negative_counts(self):
+		self.assertEqual(self.parse_error(["--related", "-1"]), 2)
+
+	def test_page_size_defaults_to_index_links_per_page(self):
+		self.assertEqual(build.parse_arguments([]).page_size, build.Site.INDEX_LINKS_PER_PAGE)
+
+	def test_page_size_rejects_zero(self):
+		self.assertEqual(self.parse_error(["--page-size", "0"]), 2)
+
+	def test_feed_items_defaults_to_feed_items(self):
+		self.assertEqual(build.parse_arguments([]).feed_items, build.Site.FEED_ITEMS)
+
+	def test_feed_items_rejects_zero(self):
+		self.assertEqual(self.parse_error(["--feed-items", "0"]), 2)
+
+
+class TestFeatureScanner(unittest.TestCase):
+	def scan(self, content):
+		return build.FeatureScanner().scan(content)
+
+	def test_display_and_inline_math(self):
+		self.assertEqual(self.scan("<p>$$x^2$$</p>"), {build.FeatureScanner.FEATURE_MATH})
+		self.assertEqual(self.scan("<p>where $x$ is</p>"), {build.FeatureScanner.FEATURE_MATH})
+
+	def test_single_dollar_is_not_math(self):
+		self.assertEqual(self.scan("<p>it costs $5</p>"), set())
+
+	def test_math_ignores_braced_delimiters(self):
+		self.assertEqual(self.scan("<p>${x$</p>"), set())
+		self.assertEqual(self.scan("<p>${a$b}$</p>"), {build.FeatureScanner.FEATURE_MATH})
+
+	def test_math_in_code_and_scripts_is_ignored(self):
+		for content in ["<pre>$x$</pre>", "<code>$x$</code>", "<script>var a = \"$x$\";</script>", "<textarea>$x$</textarea>"]:
+			self.assertEqual(self.scan(content), set())
+
+		self.assertEqual(self.scan("<pre><code>$x$</code></pre><p>$y$</p>"), {build.FeatureScanner.FEATURE_MATH})
+
+	def test_prettyprint_class_is_code(self):
+		self.assertEqual(self.scan("<pre class=\"lang-js prettyprint\">a</pre>"), {build.FeatureScanner.FEATURE_CODE})
+		self.assertEqual(self.scan("<pre class=\"prettyprinted\">a</pre>"), set())
+
+	def test_plain_content_has_no_features(self):
+		self.assertEqual(self.scan("<p>text <b>bold</b></p>"), set())
+
+
+class TestCriticalCSS(unittest.TestCase):
+	def extract(self, css, page):
+		directory = tempfile.mkdtemp()
+		file = os.path.join(directory, "style.css")
+
+		css_file = open(file, "w")
+		css_file.write(css)
+		css_file.close()
+
+		try:
+			return build.CriticalCSS(file).extract(page)
+		finally:
+			shutil.rmtree(directory)
+
+	def test_unused_rules_are_dropped(self):
+		css = "/* site */\nbody { margin: 0; }\n.used { color: red; }\n.unused { color: blue; }\n"
+
+		self.assertEqual(self.extract(css, "<body><p class=\"used\">a</p></body>"), "body{margin:0}.used{color:red}")
+
+	def test_selector_lists_keep_only_matching_selectors(self):
+		self.assertEqual(self.extract("#menu > a.active, #missing { font-weight: bold; }", "<div id=\"menu\"><a class=\"active\">a</a></div>"), "#menu>a.active{font-weight:bold}")
+
+	def test_combinators(self):
+		page = "<ul><li>a</li><li>b</li></ul><h1>t</h1><div><span></span><p>p</p></div>"
+
+		self.assertEqual(self.extract("ul li + li { a: b; }", page), "ul li + li{a:b}")
+		self.assertEqual(self.extract("h1 ~ div { a: b; }", page), "h1 ~ div{a:b}")
+		self.assertEqual(self.extract("ul > p { a: b; }", page), "")
+		self.assertEqual(self.extract("div span ~ p { a: b; }", page), "div span ~ p{a:b}")
+
+	def test_attributes_and_structural_pseudo_classes(self):
+		page = "<div><span></span><p>p</p></div><input type=\"search\"><a href=\"https://example.com\">a</a>"
+
+		self.assertEqual(self.extract("input[type=\"search\"] { a: b; }", page), "input[type=\"search\"]{a:b}")
+		self.assertEqual(self.extract("a[href^=https] { a: b; }", page), "a[href^=https]{a:b}")
+		self.assertEqual(self.extract("a[href$=\".org\"] { a: b; }", page), "")
+		self.assertEqual(self.extract("div p:first-child { a: b; }", page), "")
+		self.assertEqual(self.extract("div p:last-child { a: b; }", page), "div p:last-child{a:b}")
+
+	def test_dynamic_pseudo_classes_and_elements_are_kept(self):
+		self.assertEqual(self.extract("a:hover { a: b; }\np::before { content: \"{ }\"; }", "<p><a>a</a></p>"), "a:hover{a:b}p::before{content:\"{ }\"}")
+
+	def test_at_rules(self):
+		css = "@media (max-width: 600px) { .used { a: b; } .unused { c: d; } }\n@media print { .unused { c: d; } }\n@font-face { font-family: x; }"
+
+		self.assertEqual(self.extract(css, "<p class=\"used\">a</p>"), "@media (max-width:600px){.used{a:b}}@font-face{font-family:x}")
+
+
+class TestMinifier(unittest.TestCase):
+	def minify(self, html, rewrite=None):
+		minifier = build.Minifier(rewrite)
+
+		return minifier.feed(html) + minifier.close()
+
+	def test_whitespace_with_newline_collapses_to_one_space(self):
+		self.assertEqual(self.minify("<p>a <b>b</b>\n c</p>"), "<p>a <b>b</b> c</p>")
+		self.assertEqual(self.minify("<p><a href=x>a</a>\n\t\t<a href=y>b</a></p>"), "<p><a href=x>a</a> <a href=y>b</a></p>")
+
+	def test_whitespace_between_block_elements_is_removed(self):
+		self.assertEqual(self.minify("<div>\n\t<p>a</p>\n\t<p>b</p>\n</div>"), "<div><p>a</p><p>b</p></div>")
+
+	def test_whitespace_at_head_and_body_edges_is_removed(self):
+		html = "<!DOCTYPE html>\n<html>\n<head>\n\t<meta charset=utf-8>\n\t<script src=a.js></script>\n</head>\n<body>\n\ttext\n</body>\n</html>\n"
+
+		self.assertEqual(self.minify(html), "<!DOCTYPE html><html><head><meta charset=utf-8><script src=a.js></script></head><body>text</body></html>")
+
+
+	def test_raw_elements_are_kept_byte_for_byte(self):
+		for html in [
+			"<pre>\n  a  <b>x</b>\n\tb</pre>",
+			"<textarea>\n a\n\n</textarea>",
+			"<script>\nif (a < b)  { x(\"  \"); }\n</script>",
+			"<style>\n p  { color: red; }\n</style>"
+		]:
+			self.assertEqual(self.minify(html), html)
+
+	def test_raw_elements_are_kept_across_fragments(self):
+		minifier = build.Minifier()
+		result = minifier.feed("<pre>\n  a") + minifier.feed("  b\n</pr") + minifier.feed("e>\n\n<p>c</p>") + minifier.close()
+
+		self.assertEqual(result, "<pre>\n  a  b\n</pre><p>c</p>")
+
+	def test_comments_are_removed(self):
+		self.assertEqual(self.minify("<p>a<!-- note -->b</p>"), "<p>ab</p>")
+		self.assertEqual(self.minify("<p>a <!-- note --> b</p>"), "<p>a b</p>")
+
+	def test_conditional_comments_are_kept(self):
+		self.assertEqual(self.minify("<p><!--[if IE]> x <![endif]--></p>"), "<p><!--[if IE]> x <![endif]--></p>")
+
+	def test_attribute_quotes(self):
+		html = "<a href=\"page.html\" title=\"two words\" class='x' data-a=\"\" data-b=\"a/\"><img src=\"a.png\" alt=\"\" /></a>"
+
+		self.assertEqual(self.minify(html), "<a href=page.html title=\"two words\" class=x data-a=\"\" data-b=\"a/\"><img src=a.png alt=\"\"/></a>")
+
+	def test_references_are_rewritten(self):
+		self.assertEqual(self.minify("<img src=\"a.png\" alt=a>", lambda reference: "assets/" + reference), "<img src=assets/a.png alt=a>")
+
+	def test_bytes_saved_report(self):
+		minifier = build.Minifier()
+		result = minifier.feed("<p>\u00e9  a</p>\n") + minifier.feed("<!-- x -->") + minifier.close()
+
+		self.assertEqual(result, "<p>\u00e9 a</p>")
+		self.assertEqual(minifier.bytes_in, len("<p>\u00e9  a</p>\n<!-- x -->".encode("utf-8")))
+		self.assertEqual(minifier.bytes_out, len(result.encode("utf-8")))
+		self.assertEqual(minifier.get_saved(), minifier.bytes_in - minifier.bytes_out)
+
+
+class TestReadImageSize(unittest.TestCase):
+	PNG = b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR" + struct.pack(">IIBBBBB", 640, 480, 8, 6, 0, 0, 0) + b"\x00" * 4
+	GIF = b"GIF89a" + struct.pack("<HH", 320, 200) + b"\xf7\x00\x00" + b"\x00" * 16
+	JPEG = b"\xff\xd8" +\
+		b"\xff\xe1" + struct.pack(">H", 16) + b"Exif\x00\x00MM\x00\x2a\x00\x00\x00\x08" +\
+		b"\xff\xdb" + struct.pack(">H", 4) + b"\x00\x01" +\
+		b"\xff\xff\xc0" + struct.pack(">HBHHB", 11, 8, 240, 380, 3) + b"\x01\x22\x00" +\
+		b"\xff\xd9"
+	WEBP_VP8 = b"RIFF" + struct.pack("<I", 30) + b"WEBP" + b"VP8 " + struct.pack("<I", 18) + b"\x00" * 3 + b"\x9d\x01\x2a" + struct.pack("<HH", 400, 300) + b"\x00" * 8
+	WEBP_VP8L = b"RIFF" + struct.pack("<I", 30) + b"WEBP" + b"VP8L" + struct.pack("<I", 10) + b"\x2f" + struct.pack("<I", (100 - 1) | (50 - 1) << 14) + b"\x00" * 8
+	WEBP_VP8X = b"RIFF" + struct.pack("<I", 30) + b"WEBP" + b"VP8X" + struct.pack("<I", 10) + b"\x00" * 4 + (1024 - 1).to_bytes(3, "little") + (768 - 1).to_bytes(3, "little") + b"\x00" * 8
+
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+
+	def tearDown(self):
+		shutil.rmtree(self.directory)
+
+	def read_image_size(self, data):
+		file = os.path.join(self.directory, "image")
+
+		image_file = open(file, "wb")
+		image_file.write(data)
+		image_file.close()
+
+		size = build.read_image_size(file)
+
+		return None if size is None else tuple(size)
+
+	def test_png(self):
+		self.assertEqual(self.read_image_size(self.PNG), (640, 480))
+
+	def test_gif(self):
+		self.assertEqual(self.read_image_size(self.GIF), (320, 200))
+
+	def test_jpeg_with_exif_segment_before_frame(self):
+		self.assertEqual(self.read_image_size(self.JPEG), (380, 240))
+
+	def test_webp(self):
+		self.assertEqual(self.read_image_size(self.WEBP_VP8), (400, 300))
+		self.assertEqual(self.read_image_size(self.WEBP_VP8L), (100, 50))
+		self.assertEqual(self.read_image_size(self.WEBP_VP8X), (1024, 768))
+
+	def test_truncated_files(self):
+		for data, length in [
+			(self.PNG, 24),
+			(self.GIF, 10),
+			(self.JPEG, self.JPEG.index(b"\xff\xc0") + 9),
+			(self.WEBP_VP8, 30),
+			(self.WEBP_VP8L, 30),
+			(self.WEBP_VP8X, 30)
+		]:
+			for truncated in range(length):
+				self.assertIsNone(self.read_image_size(data[:truncated]))
+
+	def test_unknown_format(self):
+		self.assertIsNone(self.read_image_size(b"<svg xmlns=\"http://www.w3.org/2000/svg\"></svg>"))
+
+
+class TestSearchIndex(unittest.TestCase):
+	STEMS = [
+		["relational", "relate"],
+		["conditional", "condition"],
+		["organization", "organize"],
+		["hopefulness", "hopeful"],
+		["callousness", "callous"],
+		["effectiveness", "effective"],
+		["generations", "generate"],
+		["generation", "generate"],
+		["surprisingly", "surpris"],
+		["reportedly", "report"],
+		["paintings", "paint"],
+		["rendering", "render"],
+		["bodies", "body"],
+		["copied", "copy"],
+		["jumped", "jump"],
+		["quickly", "quick"],
+		["class", "class"],
+		["texts", "text"],
+		["noise", "noise"],
+		["sing", "sing"],
+		["bus", "bus"]
+	]
+
+	QUERY = "The Rendering of 3D noise, and rendered noises: CITIES with ants x " + "y" * 40
+
+	def test_stem(self):
+		for term, stem in self.STEMS:
+			self.assertEqual(build.SearchIndex.stem(term), stem, term)
+
+	def test_get_terms(self):
+		self.assertEqual(build.SearchIndex.get_terms(self.QUERY), {"render": 2, "3d": 1, "noise": 2, "city": 1, "ant": 1})
+
+	def test_build_shards(self):
+		shards = build.SearchIndex.build_shards([{"noise": 2, "render": 1}, {"noise": 1}, {}, {"noise": 3}])
+
+		self.assertEqual(shards, {"n": {"noise": [0, 2, 1, 1, 2, 3]}, "r": {"render": [0, 1]}})
+
+	def test_javascript_stemmer_matches(self):
+		node = shutil.which("node")
+
+		if node is None:
+			self.skipTest("node is not installed")
+
+		index = {
+			"lengths": [build.SearchIndex.TERM_LENGTH_MIN, build.SearchIndex.TERM_LENGTH_MAX, build.SearchIndex.STEM_LENGTH_MIN],
+			"suffixes": build.SearchIndex.SUFFIXES,
+			"stopwords": build.SearchIndex.STOPWORDS
+		}
+		queries = [term for term, stem in self.STEMS] + [self.QUERY]
+		script = os.path.join(os.path.dirname(os.path.abspath(build.__file__)), build.Site.FILE_SEARCH_SCRIPT)
+		program = "var input = JSON.parse(require(\"fs\").readFileSync(0, \"utf8\"));" +\
+			"require(\"vm\").runInThisContext(require(\"fs\").readFileSync(process.argv[1], \"utf8\"));" +\
+			"console.log(JSON.stringify(input.queries.map(function(query) { return searchTerms(input.index, query); })));"
+		output = subprocess.run([node, "-e", program, script], input=json.dumps({"index": index, "queries": queries}), capture_output=True, text=True, check=True).stdout
+
+		self.assertEqual(json.loads(output), [list(build.SearchIndex.get_terms(query)) for query in queries])
+
+
+class TestIncrementalBuild(unittest.TestCase):
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.cwd = os.getcwd()
+
+		shutil.copytree(os.path.dirname(os.path.abspath(build.__file__)), self.directory, dirs_exist_ok=True, ignore=shutil.ignore_patterns(".git", build.Site.DIR_CACHE))
+		os.chdir(self.directory)
+
+	def tearDown(self):
+		os.chdir(self.cwd)
+		shutil.rmtree(self.directory)
+
+	def build(self):
+		log = io.StringIO()
+
+		with contextlib.redirect_stdout(log):
+			build.build(None, build.parse_arguments([]))
+
+		build.profiler.pop_records()
+
+		return log.getvalue()
+
+	def read(self, file):
+		output = open(file)
+		content = output.read()
+		output.close()
+
+		return content
+
+	def test_unchanged_outputs_are_skipped(self):
+		self.build()
+
+		self.assertIn("Skipping about.html, it is up to date", self.build())
+
+	def test_modified_output_is_rebuilt(self):
+		self.build()
+
+		expected = self.read("about.html")
+
+		output = open("about.html", "w")
+		output.write("<p>stale</p>")
+		output.close()
+
+		log = self.build()
+
+		self.assertIn("Building about.html", log)
+		self.assertEqual(self.read("about.html"), expected)
+
+
+	def test_corrupt_manifest_is_ignored(self):
+		self.build()
+
+		manifest = open(os.path.join(build.Site.DIR_CACHE, build.Manifest.FILE), "w")
+		manifest.write("{\"outputs\": {")
+		manifest.close()
+
+		log = self.build()
+
+		self.assertIn("Ignoring corrupt", log)
+		self.assertIn("Building about.html", log)
+		self.assertIn("Skipping about.html, it is up to date", self.build())
+
+
+if __name__ == "__main__":
+	unittest.main()